@@ -1,18 +1,55 @@
-from fastapi import FastAPI, HTTPException, Header
-from typing import Optional, List, Dict, Any
+from fastapi import FastAPI, HTTPException, Header, Query
+from fastapi.responses import Response, StreamingResponse
+from fastapi.routing import APIRoute
+from typing import Optional, List, Dict, Any, NamedTuple
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from hashing_password import hash_password, verify_password
+import anyio
+import csv
+import io
+import functools
+import hashlib
+import os
 import re
 import uuid
 import datetime
 from models import Roles, Users, PasswordChangeRequest, UserToken, Manufactures, ComponentsTypes, Components, \
-    Configurations, ConfigurationsComponents, OrdersStatus, Orders, OrderConfigurations
-from database import db_connection
+    Configurations, ConfigurationsComponents, OrdersStatus, Orders, OrderConfigurations, ComponentsChangeLog, \
+    ComponentsSearchIndex, ComponentsAttributes, run_migrations, tokenize, queue_components_reindex, next_catalog_version, \
+    normalize_attribute_key, update_configuration_totals
+from database import db_connection, get_pool_stats
 from pydantic import BaseModel
-from email_utils import generation_confirmation_code, send_email
+from email_utils import generation_confirmation_code
+from email_outbox import enqueue_email, email_worker
+from catalog_indexer import index_worker
+from cache_utils import TTLCache, VersionCounter, ReferenceCache
+from json_utils import FastJSONResponse, dumps
+from compatibility import check_configuration, check_configurations, compatibility_report, configuration_items, \
+    select_incompatible_ids, select_underpowered_psu_ids, filled_single_part_type_ids
 from decimal import Decimal
+from peewee import JOIN, fn, Case, SQL
 
-app = FastAPI()
+API_THREADPOOL_SIZE = int(os.getenv('API_THREADPOOL_SIZE', 20))
+DB_AUTO_MIGRATE = os.getenv('DB_AUTO_MIGRATE', '1') == '1'
+GZIP_MINIMUM_SIZE = int(os.getenv('GZIP_MINIMUM_SIZE', 1024))
+GZIP_COMPRESS_LEVEL = int(os.getenv('GZIP_COMPRESS_LEVEL', 6))
+
+def with_db_connection(endpoint):
+    """Выполнение обработчика с соединением из пула, полученным в его рабочем потоке"""
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        with db_connection.connection_context():
+            return endpoint(*args, **kwargs)
+    return wrapper
+
+class DBConnectionRoute(APIRoute):
+    """Маршрут, синхронный обработчик которого получает соединение из пула на время запроса"""
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, with_db_connection(endpoint), **kwargs)
+
+app = FastAPI(default_response_class=FastJSONResponse)
+app.router.route_class = DBConnectionRoute
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,31 +59,132 @@ app.add_middleware(
     allow_headers=['*']
 )
 
+# Сжатие ответов больше GZIP_MINIMUM_SIZE байт для клиентов с Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+
+@app.on_event('startup')
+def on_startup():
+    """Применение миграций, загрузка справочников и ограничение пула потоков обработчиков при запуске приложения"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
+    with db_connection.connection_context():
+        if DB_AUTO_MIGRATE:
+            run_migrations()
+        for cache in reference_caches:
+            cache.load()
+    email_worker.start()
+    index_worker.start()
+
+@app.on_event('shutdown')
+def on_shutdown():
+    """Остановка отправки писем и переиндексации, закрытие всех соединений пула при остановке приложения"""
+    email_worker.stop()
+    index_worker.stop()
+    db_connection.close_all()
+
 EMAIL_REGEX = r'^[A-Za-zА-Яа-яЁё0-9._%+-]+@[A-Za-zА-Яа-яЁё-]+\.[A-Za-zА-Яа-яЁё-]{2,10}$'
 PHONE_REGEX = r'^[0-9+()\-#]{10,15}$'
 
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+# Выгрузки читаются из БД блоками по EXPORT_CHUNK_SIZE строк, поэтому расход памяти не зависит от размера таблицы
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+ORDER_EXPORT_FIELDS = ('id', 'user_id', 'user_login', 'order_date', 'total_amount', 'status_name')
+ORDER_CONFIGURATION_EXPORT_FIELDS = ('id', 'order_id', 'order_user_id', 'order_user_login', 'order_date', 'order_total',
+                                     'order_status', 'configuration_id', 'configuration_name', 'configuration_user_id',
+                                     'configuration_user_login', 'quantity', 'price_at_time')
+
+TOKEN_LIFETIME = datetime.timedelta(hours=1)
+# Срок действия токена продлевается только когда до его истечения осталось меньше этого порога,
+# поэтому активный токен перезаписывается в БД не чаще раза в (TOKEN_LIFETIME - TOKEN_REFRESH_THRESHOLD).
+# Значение, равное TOKEN_LIFETIME, возвращает продление при каждой проверке.
+TOKEN_REFRESH_THRESHOLD = datetime.timedelta(minutes=45)
+# В кэше хранятся только успешно проверенные токены. Сброс кэша при выходе, удалении пользователя и смене роли
+# действует только в текущем процессе, поэтому в остальных процессах API отозванный токен или прежняя роль
+# продолжают действовать не дольше TOKEN_CACHE_TTL секунд.
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', 5))
+TOKEN_CACHE_MAXSIZE = 10000
+
+class CachedToken(NamedTuple):
+    """Данные проверенного токена, хранимые в кэше"""
+    user_id: int
+    role_name: str
+    expires_at: datetime.datetime
+
+token_cache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL)
+
+# Версия каталога увеличивается при каждом изменении компонентов, производителей и типов.
+# Страницы каталога кэшируются уже закодированными в JSON по ключу (версия, limit, after);
+# TTL ограничивает устаревание данных в других процессах API, где версия не увеличивалась.
+CATALOG_CACHE_TTL = 30
+CATALOG_CACHE_MAXSIZE = 256
+
+catalog_version = VersionCounter()
+catalog_cache = TTLCache(maxsize=CATALOG_CACHE_MAXSIZE, ttl=CATALOG_CACHE_TTL)
+
+REFERENCE_CACHE_TTL = 60
+
+roles_cache = ReferenceCache(
+    lambda: Roles.select(Roles.id, Roles.name).order_by(Roles.id).tuples(), REFERENCE_CACHE_TTL)
+statuses_cache = ReferenceCache(
+    lambda: OrdersStatus.select(OrdersStatus.id, OrdersStatus.name).order_by(OrdersStatus.id).tuples(), REFERENCE_CACHE_TTL)
+component_types_cache = ReferenceCache(
+    lambda: ComponentsTypes.select(ComponentsTypes.id, ComponentsTypes.name, ComponentsTypes.description)
+    .order_by(ComponentsTypes.id).tuples(), REFERENCE_CACHE_TTL)
+manufactures_cache = ReferenceCache(
+    lambda: Manufactures.select(Manufactures.id, Manufactures.name).order_by(Manufactures.id).tuples(), REFERENCE_CACHE_TTL)
+reference_caches = [roles_cache, statuses_cache, component_types_cache, manufactures_cache]
+
+def invalidate_user_tokens(user_id: int):
+    """Удаление из кэша текущего процесса всех токенов пользователя"""
+    token_cache.remove_where(lambda cached: cached.user_id == user_id)
+
+def load_token(token: str) -> CachedToken:
+    """Проверка токена в БД с продлением срока действия при приближении к его истечению"""
+    now = datetime.datetime.now()
+    row = (UserToken
+           .select(Users.id, Roles.name, UserToken.expires_at)
+           .join(Users)
+           .join(Roles)
+           .where(
+               (UserToken.token==token) &
+               (UserToken.expires_at > now)
+           )
+           .tuples()
+           .first())
+    
+    if not row:
+        raise HTTPException(401, 'Недействительный или просроченный токен.')
+    
+    user_id, role_name, expires_at = row
+    if expires_at - now < TOKEN_REFRESH_THRESHOLD:
+        expires_at = now + TOKEN_LIFETIME
+        UserToken.update(expires_at=expires_at).where(
+            (UserToken.token==token) &
+            (UserToken.expires_at < expires_at)
+        ).execute()
+    return CachedToken(user_id, role_name, expires_at)
+
 def get_user_by_token(token: str, required_role: Optional[str] = None) -> Users:
-    """Получение пользователя по токену с проверкой роли и срока действия"""
+    """Получение пользователя по токену с проверкой роли и срока действия.
+    
+    Возвращает модель пользователя, в которой заполнен только ID."""
     try:
-        user_token = (UserToken.select().join(Users).where(
-            (UserToken.token==token) &
-            (UserToken.expires_at > datetime.datetime.now()) 
-        ).first())
-        
-        if not user_token:
-            raise HTTPException(401, 'Недействительный или просроченный токен.')
-               
-        user = user_token.user_id
-        user_role = Roles.get_by_id(user.role_id)
+        cached = token_cache.get(token)
+        if cached is None or cached.expires_at <= datetime.datetime.now():
+            cached = load_token(token)
+            token_cache.set(token, cached)
+        
         if required_role:
-            if user_role.name != 'Администратор':
-                if user_role.name != required_role:
+            if cached.role_name != 'Администратор':
+                if cached.role_name != required_role:
                     raise HTTPException(403, 'Недостаточно прав для выполнения этого действия.')
         
-        user_token.expires_at = datetime.datetime.now() + datetime.timedelta(hours=1)
-        user_token.save()
-        
-        return user
+        return Users(id=cached.user_id)
     
     except HTTPException as http_exc:
         raise http_exc
@@ -54,22 +192,376 @@ def get_user_by_token(token: str, required_role: Optional[str] = None) -> Users:
         raise HTTPException(500, f'Ошибка при проверке токена: {e}')
     
 def get_component_type_by_name(type_name: str):
-    """Получение типа компонента по названию"""
+    """Получение типа компонента по названию из кэша справочника"""
     if not type_name:
         return None
-    component_type = ComponentsTypes.select().where(ComponentsTypes.name==type_name).first()
-    if not component_type:
+    type_id = component_types_cache.get_id(type_name)
+    if type_id is None:
         raise HTTPException(404, f'Тип компонента {type_name} не найден.')
-    return component_type
+    return ComponentsTypes(id=type_id, name=type_name)
 
 def get_manufacture_by_name(manufacture_name: str):
-    """Получение производителя по названию"""
+    """Получение производителя по названию из кэша справочника"""
     if not manufacture_name:
         return None
-    manufacture = Manufactures.select().where(Manufactures.name==manufacture_name).first()
-    if not manufacture:
+    manufacture_id = manufactures_cache.get_id(manufacture_name)
+    if manufacture_id is None:
         raise HTTPException(404, f'Производитель {manufacture_name} не найден.')
-    return manufacture
+    return Manufactures(id=manufacture_id, name=manufacture_name)
+
+# Поля каталога компонентов в порядке вывода и соответствующие им столбцы
+COMPONENT_FIELDS = {
+    'id': Components.id,
+    'name': Components.name,
+    'type_name': ComponentsTypes.name,
+    'manufacture_name': Manufactures.name,
+    'price': Components.price,
+    'stock_quantity': Components.stock_quantity,
+    'specification': Components.specification
+}
+
+def parse_fields(fields: Optional[str], allowed: Dict[str, Any]) -> tuple:
+    """Разбор параметра fields= в список полей в порядке allowed; поле id возвращается всегда"""
+    if not fields:
+        return tuple(allowed)
+    
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(400, f'Неизвестные поля: {", ".join(sorted(unknown))}. Допустимые значения: {", ".join(allowed)}.')
+    
+    requested.add('id')
+    return tuple(field for field in allowed if field in requested)
+
+def select_components_catalog(fields: tuple = tuple(COMPONENT_FIELDS)):
+    """Запрос каталога компонентов с типом и производителем одним JOIN-запросом, только с указанными полями"""
+    query = Components.select(*[COMPONENT_FIELDS[field] for field in fields])
+    if 'type_name' in fields:
+        query = query.join(ComponentsTypes, JOIN.LEFT_OUTER).switch(Components)
+    if 'manufacture_name' in fields:
+        query = query.join(Manufactures, JOIN.LEFT_OUTER).switch(Components)
+    return query.order_by(Components.id).tuples()
+
+def log_component_changes(component_ids: List[int], action: str = 'upsert', reindex: bool = True):
+    """Запись изменений компонентов в журнал для дельта-синхронизации каталога и постановка их в очередь переиндексации"""
+    if component_ids:
+        version = next_catalog_version()
+        ComponentsChangeLog.insert_many(
+            [{'component_id': component_id, 'action': action, 'version': version} for component_id in component_ids]
+        ).execute()
+        if reindex:
+            queue_components_reindex(component_ids)
+
+def catalog_changed():
+    """Сброс кэша страниц каталога и запуск переиндексации после фиксации изменений компонентов"""
+    catalog_version.bump()
+    index_worker.notify()
+
+def select_component_configuration_ids(component_ids: List[int]):
+    """Подзапрос ID конфигураций, в которые входят указанные компоненты"""
+    return (ConfigurationsComponents
+            .select(ConfigurationsComponents.configuration_id)
+            .where(ConfigurationsComponents.components_id.in_(component_ids)))
+
+def get_configuration_components_list(config_id: int) -> List[Dict[str, Any]]:
+    """Компоненты конфигурации с типом и производителем одним JOIN-запросом"""
+    rows = (ConfigurationsComponents
+            .select(ConfigurationsComponents.id, ConfigurationsComponents.quantity,
+                    Components.id, Components.name, Components.price,
+                    ComponentsTypes.name, Manufactures.name)
+            .join(Components)
+            .join(ComponentsTypes, JOIN.LEFT_OUTER).switch(Components)
+            .join(Manufactures, JOIN.LEFT_OUTER)
+            .where(ConfigurationsComponents.configuration_id==config_id)
+            .order_by(ConfigurationsComponents.id)
+            .tuples())
+    return [{
+        'id': cc_id,
+        'component_id': component_id,
+        'component_name': component_name,
+        'type_name': type_name,
+        'manufacture_name': manufacture_name,
+        'price': price,
+        'quantity': quantity,
+        'total_price': price * quantity
+    } for cc_id, quantity, component_id, component_name, price, type_name, manufacture_name in rows]
+
+def parse_spec_filters(spec: Optional[List[str]]) -> List[tuple]:
+    """Разбор фильтров по характеристикам вида "ключ:значение" в пары (ключ, значение)"""
+    filters = []
+    for item in spec or []:
+        key, separator, value = item.partition(':')
+        if not separator or not key.strip() or not value.strip():
+            raise HTTPException(400, f'Неверный фильтр по характеристике "{item}". Ожидается формат "ключ:значение".')
+        filters.append((normalize_attribute_key(key), value.strip()))
+    return filters
+
+def select_components_with_attribute(key: str, value: str):
+    """ID компонентов с указанным значением характеристики (индексированный поиск по ключу и значению)"""
+    return (ComponentsAttributes
+            .select(ComponentsAttributes.component_id)
+            .where((ComponentsAttributes.key==key) & (ComponentsAttributes.value==value)))
+
+def select_text_search(q: str):
+    """Ранжированный поиск по индексу: компоненты, у которых для каждого слова запроса есть слово индекса с таким началом"""
+    terms = list(dict.fromkeys(tokenize(q)))
+    if not terms:
+        return None
+    
+    Index = ComponentsSearchIndex
+    matches = [Index.term.startswith(term) for term in terms]
+    any_match = matches[0]
+    for match in matches[1:]:
+        any_match |= match
+    
+    query = (Index
+             .select(Index.component_id, fn.SUM(Index.weight * Case(None, [(Index.term.in_(terms), 2)], 1)).alias('rank'))
+             .where(any_match)
+             .group_by(Index.component_id))
+    for match in matches:
+        query = query.having(fn.MAX(Case(None, [(match, 1)], 0)) == 1)
+    return query
+
+def select_component_ids(condition) -> List[int]:
+    """ID компонентов, удовлетворяющих условию"""
+    return [component_id for component_id, in Components.select(Components.id).where(condition).tuples()]
+
+# Варианты сортировки поиска компонентов: поле каталога и порядок по убыванию
+COMPONENT_SORTS = {
+    'id': ('id', False),
+    'name': ('name', False),
+    'price_asc': ('price', False),
+    'price_desc': ('price', True)
+}
+
+def component_search_conditions(
+    type_name: Optional[str] = None,
+    manufacture_name: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    q: Optional[str] = None,
+    in_stock: bool = False,
+    spec_filters: Optional[List[tuple]] = None
+):
+    """Условия WHERE для фильтров каталога; тип и производитель ищутся по ID из кэша справочников, текст - по поисковому индексу"""
+    conditions = []
+    if type_name:
+        type_id = component_types_cache.get_id(type_name)
+        conditions.append(Components.type_id.in_([type_id] if type_id is not None else []))
+    if manufacture_name:
+        manufacture_id = manufactures_cache.get_id(manufacture_name)
+        conditions.append(Components.manufactures_id.in_([manufacture_id] if manufacture_id is not None else []))
+    if min_price is not None:
+        conditions.append(Components.price >= min_price)
+    if max_price is not None:
+        conditions.append(Components.price <= max_price)
+    if in_stock:
+        conditions.append(Components.stock_quantity > 0)
+    for key, value in spec_filters or []:
+        conditions.append(Components.id.in_(select_components_with_attribute(key, value)))
+    if q and q.strip():
+        text_search = select_text_search(q)
+        if text_search is None:
+            conditions.append(Components.id.in_([]))
+        else:
+            conditions.append(Components.id.in_(text_search.select(ComponentsSearchIndex.component_id)))
+    return conditions
+
+# Границы ценовых диапазонов для фасетов каталога; последний диапазон не ограничен сверху
+PRICE_BUCKETS = [0, 5000, 10000, 20000, 50000, 100000]
+
+def price_bucket_expression():
+    """Выражение SQL с номером ценового диапазона компонента"""
+    return Case(None, [(Components.price < bound, index) for index, bound in enumerate(PRICE_BUCKETS[1:])],
+                len(PRICE_BUCKETS) - 1)
+
+def count_components_by(query, field) -> List[tuple]:
+    """Число компонентов отфильтрованного запроса в каждой группе по полю или выражению"""
+    return list(query.select(field.alias('facet'), fn.COUNT(Components.id)).group_by(SQL('facet')).tuples())
+
+def fetch_sorted_page(query, sort: str, fields: tuple, limit: int, after: Optional[str] = None):
+    """Keyset-пагинация каталога с сортировкой: курсор - ID или пара "значение:ID" для остальных сортировок"""
+    sort_name, descending = COMPONENT_SORTS[sort]
+    sort_field = COMPONENT_FIELDS[sort_name]
+    
+    if after:
+        try:
+            if sort_name == 'id':
+                query = query.where(Components.id > int(after))
+            else:
+                value, _, last_id = after.rpartition(':')
+                last_id = int(last_id)
+                if sort_name == 'price':
+                    value = Decimal(value)
+                beyond = sort_field < value if descending else sort_field > value
+                query = query.where(beyond | ((sort_field == value) & (Components.id > last_id)))
+        except (ValueError, ArithmeticError):
+            raise HTTPException(400, 'Неверное значение курсора after.')
+    
+    order = [Components.id] if sort_name == 'id' else [sort_field.desc() if descending else sort_field.asc(), Components.id]
+    rows = list(query.order_by(*order).limit(limit + 1))
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    last_row = dict(zip(fields, rows[-1]))
+    next_cursor = str(last_row['id']) if sort_name == 'id' else f"{last_row[sort_name]}:{last_row['id']}"
+    return rows, next_cursor
+
+def component_row_to_dict(row, fields: tuple = tuple(COMPONENT_FIELDS)) -> dict:
+    """Преобразование строки каталога компонентов в словарь ответа"""
+    return dict(zip(fields, row))
+
+def encode_json(content) -> bytes:
+    """Кодирование содержимого ответа в JSON так же, как это делает FastJSONResponse"""
+    return dumps(content)
+
+def make_etag(body: bytes) -> str:
+    """Строгий ETag по содержимому закодированного ответа"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Есть ли у клиента актуальная версия ответа по заголовку If-None-Match"""
+    if not if_none_match:
+        return False
+    client_etags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return etag in client_etags or '*' in client_etags
+
+def etag_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    """JSON-ответ с ETag или 304 Not Modified, если у клиента уже актуальная версия"""
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers={'ETag': etag})
+    return Response(content=body, media_type='application/json', headers={'ETag': etag})
+
+def reference_response(cache: ReferenceCache, if_none_match: Optional[str], build_content) -> Response:
+    """Ответ со справочником из кэша: ETag берется из версии кэша, тело собирается только если клиенту нужен не 304"""
+    etag = '"' + cache.version() + '"'
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers={'ETag': etag})
+    return Response(content=encode_json(build_content()), media_type='application/json', headers={'ETag': etag})
+
+def fetch_page(query, id_field, limit: int, after: Optional[int] = None):
+    """Keyset-пагинация запроса по ID: строки страницы и курсор следующей страницы"""
+    if after is not None:
+        query = query.where(id_field > after)
+    rows = list(query.order_by(id_field).limit(limit + 1))
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    last_row = rows[-1]
+    next_cursor = last_row[0] if isinstance(last_row, tuple) else getattr(last_row, id_field.name)
+    return rows, next_cursor
+
+def iterate_chunks(query, id_field, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Обход tuples-запроса блоками по ID; каждый блок читается курсором .iterator() в своем соединении из пула"""
+    after = None
+    while True:
+        chunk_query = query if after is None else query.where(id_field > after)
+        with db_connection.connection_context():
+            rows = list(chunk_query.order_by(id_field).limit(chunk_size).iterator())
+        if not rows:
+            return
+        
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        after = rows[-1][0]
+
+def csv_value(value):
+    """Значение ячейки CSV: вложенные структуры записываются как JSON, даты - в формате ISO"""
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode('utf-8')
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+def iter_ndjson(chunks, fields: tuple):
+    """Кодирование блоков строк в NDJSON: по одному JSON-объекту на строку"""
+    for rows in chunks:
+        yield b''.join(dumps(dict(zip(fields, row))) + b'\n' for row in rows)
+
+def iter_csv(chunks, fields: tuple):
+    """Кодирование блоков строк в CSV с заголовком"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for rows in chunks:
+        writer.writerows([csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def export_response(query, id_field, fields: tuple, export_format: str, filename: str) -> StreamingResponse:
+    """Потоковая выгрузка запроса в NDJSON или CSV без загрузки всей таблицы в память"""
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(400, f'Неверный формат выгрузки. Допустимые значения: {", ".join(EXPORT_MEDIA_TYPES)}.')
+    
+    encode = iter_csv if export_format == 'csv' else iter_ndjson
+    return StreamingResponse(
+        encode(iterate_chunks(query, id_field), fields),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{export_format}"'}
+    )
+
+def select_order_configurations_report():
+    """Запрос связей заказов и конфигураций с данными заказа, статуса и пользователей одним JOIN-запросом"""
+    OrderUser = Users.alias()
+    ConfigUser = Users.alias()
+    return (OrderConfigurations
+            .select(
+                OrderConfigurations.id,
+                Orders.id,
+                OrderUser.id,
+                OrderUser.email,
+                Orders.order_date,
+                Orders.total_amout,
+                OrdersStatus.name,
+                Configurations.id,
+                Configurations.name_config,
+                ConfigUser.id,
+                ConfigUser.email,
+                OrderConfigurations.quantity,
+                OrderConfigurations.price_at_time)
+            .join(Orders)
+            .join(OrderUser, on=(Orders.user_id==OrderUser.id))
+            .switch(Orders)
+            .join(OrdersStatus)
+            .switch(OrderConfigurations)
+            .join(Configurations)
+            .join(ConfigUser, on=(Configurations.user_id==ConfigUser.id))
+            .tuples())
+
+def get_order_configurations_map(order_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Загрузка конфигураций набора заказов одним запросом с группировкой по ID заказа"""
+    configs_map = {order_id: [] for order_id in order_ids}
+    if not order_ids:
+        return configs_map
+    
+    order_configs = (OrderConfigurations
+                     .select(
+                         OrderConfigurations.order_id,
+                         Configurations.id,
+                         Configurations.name_config,
+                         OrderConfigurations.quantity,
+                         OrderConfigurations.price_at_time)
+                     .join(Configurations)
+                     .where(OrderConfigurations.order_id.in_(order_ids))
+                     .order_by(OrderConfigurations.id)
+                     .tuples())
+    
+    for order_id, configuration_id, configuration_name, quantity, price_at_time in order_configs:
+        configs_map[order_id].append({
+            'configuration_id': configuration_id,
+            'configuration_name': configuration_name,
+            'quantity': quantity,
+            'price_at_time': price_at_time
+        })
+    return configs_map
 
 class AuthRequest(BaseModel):
     """Модель запроса для аутентификации"""
@@ -154,7 +646,7 @@ class UserSearch(BaseModel):
     phone: str | None = None
     
 @app.post('/users/register/', tags=['Users'])
-async def create_user(email: str, password: str, full_name: str, number_phone: str, address: str):
+def create_user(email: str, password: str, full_name: str, number_phone: str, address: str):
     """Регистрация нового пользователя в системе"""
     if not re.fullmatch(EMAIL_REGEX, email) or not re.fullmatch(PHONE_REGEX, number_phone):
         raise HTTPException(400, 'Неверный формат данных email/номера телефона')
@@ -164,14 +656,16 @@ async def create_user(email: str, password: str, full_name: str, number_phone: s
             raise HTTPException(403, 'Пользователь с таким email/номером телефона уже существует.')
 
         hashed_password = hash_password(password=password)
+        user_role_id = roles_cache.get_id('Пользователь')
+        if user_role_id is None:
+            raise HTTPException(500, 'Не найдена роль "Пользователь".')
         with db_connection.atomic():
-            user_role = Roles.get(Roles.name=='Пользователь')
             Users.create(
                 name=full_name,
                 email=email,
                 password=hashed_password,
                 phone=number_phone,
-                role_id=user_role.id,
+                role_id=user_role_id,
                 address=address
             )
         return {'message': 'Вы успешно зарегистрировались!'}
@@ -182,7 +676,7 @@ async def create_user(email: str, password: str, full_name: str, number_phone: s
         raise HTTPException(500, f'Произошла ошибка при регистрации: {e}')
     
 @app.post('/users/auth/', tags=['Users'])
-async def auth_user(data: AuthRequest):
+def auth_user(data: AuthRequest):
     """Аутентификация пользователя по email или телефону с паролем"""
     email = data.email
     phone = data.phone
@@ -210,7 +704,7 @@ async def auth_user(data: AuthRequest):
             raise HTTPException(401, 'Вы ввели неправильный пароль! Попробуйте еще раз.')
         
         token = str(uuid.uuid4())
-        expires_at = datetime.datetime.now() + datetime.timedelta(hours=1)
+        expires_at = datetime.datetime.now() + TOKEN_LIFETIME
         
         UserToken.create(
             user_id=existing_user.id,
@@ -229,7 +723,7 @@ async def auth_user(data: AuthRequest):
         raise HTTPException(500, f'Произошла ошибка при авторизации: {e}')
 
 @app.post('/users/change_password/', tags=['Users'])
-async def request_change_password(email: str):
+def request_change_password(email: str):
     """Запрос на смену пароля с отправкой кода подтверждения на email"""
     user = Users.select().where(Users.email==email).first()
     if not user:
@@ -242,7 +736,7 @@ async def request_change_password(email: str):
         expires_at=expires
     )
     
-    send_email(
+    enqueue_email(
         to_email=email,
         subject='Код подтверждения смены пароля.',
         body=f'Здравствуйте! \n Ваш код подтверждения смены пароля: {code.upper()}. \n Никому не сообщайте данный код. \n Если это были не Вы, проигнорируйте данное сообщение.'
@@ -251,7 +745,7 @@ async def request_change_password(email: str):
     return {'message': 'Код подтверждения успешно отправлен на указанную почту.'}
 
 @app.post('/users/confirm_change_password/', tags=['Users'])
-async def confirm_change_password(email: str, code: str, new_password: str):
+def confirm_change_password(email: str, code: str, new_password: str):
     """Подтверждение смены пароля с помощью кода из email"""
     user = Users.select().where(Users.email==email).first()
     if not user:
@@ -280,7 +774,7 @@ async def confirm_change_password(email: str, code: str, new_password: str):
     return {'message': 'Пароль успешно обновлен.'}
 
 @app.post('/users/request_login_code/', tags=['Users'])
-async def request_login_code(email: str):
+def request_login_code(email: str):
     """Запрос кода для входа в систему через email"""
     if not re.fullmatch(EMAIL_REGEX, email):
         raise HTTPException(400, 'Неверный формат email.')
@@ -298,7 +792,7 @@ async def request_login_code(email: str):
         expires_at=expires
     )
     
-    send_email(
+    enqueue_email(
         to_email=email,
         subject='Код подтверждения для входа в ANTech',
         body=f'Здравствуйте! \nВаш код подтверждения для входа: {code.upper()}. \nКод действителен 10 минут. \nЕсли это были не Вы, проигнорируйте данное сообщение.'
@@ -307,7 +801,7 @@ async def request_login_code(email: str):
     return {'message': 'Код подтверждения успешно отправлен на указанную почту.'}
 
 @app.post('/users/confirm_login_code/', tags=['Users'])
-async def confirm_login_code(email: str, code: str):
+def confirm_login_code(email: str, code: str):
     """Подтверждение входа в систему с помощью кода из email"""
     user = Users.select().where(Users.email==email).first()
     if not user:
@@ -323,7 +817,7 @@ async def confirm_login_code(email: str, code: str):
         raise HTTPException(404, 'Неверный код подтверждения или срок его действия истек.')
 
     token = str(uuid.uuid4())
-    expires_at = datetime.datetime.now() + datetime.timedelta(hours=1)
+    expires_at = datetime.datetime.now() + TOKEN_LIFETIME
     
     UserToken.create(
         user_id=user.id,
@@ -339,10 +833,11 @@ async def confirm_login_code(email: str, code: str):
     }
 
 @app.get('/users/me/', tags=['Users'])
-async def get_profile(token: str = Header(...)):
+def get_profile(token: str = Header(...)):
     """Получение информации о текущем пользователе"""
     try:
-        user = get_user_by_token(token)
+        current_user = get_user_by_token(token)
+        user = Users.select(Users, Roles).join(Roles).where(Users.id==current_user.id).first()
         if not user:
             raise HTTPException(401, 'Не удалось найти пользователя.')
         return {
@@ -360,36 +855,52 @@ async def get_profile(token: str = Header(...)):
         raise HTTPException(500, f'Непредвиденая ошибка: {e}')
 
 @app.get('/users/get_all/', tags=['Users'])
-async def get_all_users(token: str = Header(...)):
+def get_all_users(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[int] = None,
+    token: str = Header(...)
+):
     """Получение списка всех пользователей (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     
     if not current_user:
         raise HTTPException(401, 'Не удалось найти пользователя.')
     
-    users = Users.select()
+    users, next_cursor = fetch_page(Users.select(Users, Roles).join(Roles), Users.id, limit, after)
     
-    return [
-        {
-            'id': user.id,
-            'name': user.name,
-            'email': user.email,
-            'phone': user.phone,
-            'role': user.role_id.name,
-            'address': user.address
-        } for user in users]
+    return FastJSONResponse({
+        'items': [
+            {
+                'id': user.id,
+                'name': user.name,
+                'email': user.email,
+                'phone': user.phone,
+                'role': user.role_id.name,
+                'address': user.address
+            } for user in users],
+        'next_cursor': next_cursor
+    })
 
 @app.delete('/users/delete_profile/', tags=['Users'])
-async def delete_profile(token: str = Header(...)):
+def delete_profile(token: str = Header(...)):
     """Удаление профиля текущего пользователя"""
     user = get_user_by_token(token)
     if not user:
         raise HTTPException(401, 'Не удалось найти пользователя.')
     user.delete_instance()
+    invalidate_user_tokens(user.id)
     return {'message': 'Пользователь успешно удален.'}
 
+@app.post('/users/logout/', tags=['Users'])
+def logout_user(token: str = Header(...)):
+    """Выход из системы с отзывом текущего токена"""
+    get_user_by_token(token)
+    UserToken.delete().where(UserToken.token==token).execute()
+    token_cache.pop(token)
+    return {'message': 'Вы успешно вышли из системы.'}
+
 @app.put('/users/edit_address/', tags=['Users'])
-async def edit_user_address(new_address: str, token: str = Header(...)):
+def edit_user_address(new_address: str, token: str = Header(...)):
     """Изменение адреса текущего пользователя"""
     current_user = get_user_by_token(token, 'Пользователь')
     try:
@@ -412,7 +923,7 @@ async def edit_user_address(new_address: str, token: str = Header(...)):
         raise HTTPException(500, f'Не удалось изменить адрес для пользователя: {e}')
     
 @app.post('/users/set_role/', tags=['Users'])
-async def set_role_user(data: SetRoleRequest, token: str = Header(...)):
+def set_role_user(data: SetRoleRequest, token: str = Header(...)):
     """Изменение роли пользователя (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     try:
@@ -426,18 +937,19 @@ async def set_role_user(data: SetRoleRequest, token: str = Header(...)):
         
         if not user:
             raise HTTPException(404, 'Пользователь не найден.')
-        new_role = Roles.get_or_none(Roles.name==data.new_role)
-        if not new_role:
+        new_role_id = roles_cache.get_id(data.new_role)
+        if new_role_id is None:
             raise HTTPException(400, 'Неверно указано значение новой роли. Допустимые значения: "Пользователь", "Администратор".')
         
-        user.role_id = new_role.id
+        user.role_id = new_role_id
         user.save()
+        invalidate_user_tokens(user.id)
         
         return {
             'message': 'Роль успешно изменена.',
             'email': user.email,
             'phone': user.phone,
-            'new_role': new_role.name
+            'new_role': data.new_role
         }
     except HTTPException as http_exc:
         raise http_exc
@@ -446,7 +958,7 @@ async def set_role_user(data: SetRoleRequest, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при изменении роли пользователя: {e}')
 
 @app.post("/users/get_user_by_email_or_phone/", tags=['Users'])
-async def get_user_by_login(data: UserSearch, token: str = Header(...)):
+def get_user_by_login(data: UserSearch, token: str = Header(...)):
     """Поиск пользователя по email или телефону (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -481,7 +993,7 @@ async def get_user_by_login(data: UserSearch, token: str = Header(...)):
     
 
 @app.post('/manufactures/add_manufacture/', tags=['Manufactures'])
-async def create_manufactrue(name: str, token: str = Header(...)):
+def create_manufactrue(name: str, token: str = Header(...)):
     """Создание нового производителя (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -489,6 +1001,7 @@ async def create_manufactrue(name: str, token: str = Header(...)):
     
     try:
         Manufactures.create(name=name)
+        manufactures_cache.invalidate()
         return {'message': 'Производитель успешно создан.'}
     
     except HTTPException as http_exc:
@@ -498,7 +1011,7 @@ async def create_manufactrue(name: str, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при создании производителя: {e}') 
 
 @app.put('/manufactures/edit_manufactures/', tags=['Manufactures'])
-async def edit_manufactures(manufacture_id: int, new_name: str, token: str = Header(...)):
+def edit_manufactures(manufacture_id: int, new_name: str, token: str = Header(...)):
     """Изменение названия производителя (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -509,8 +1022,12 @@ async def edit_manufactures(manufacture_id: int, new_name: str, token: str = Hea
         raise HTTPException(404, 'Производителя с указанным ID не существует.')
     
     try:
-        manufacture.name = new_name
-        manufacture.save()
+        with db_connection.atomic():
+            manufacture.name = new_name
+            manufacture.save()
+            log_component_changes(select_component_ids(Components.manufactures_id==manufacture.id))
+        catalog_changed()
+        manufactures_cache.invalidate()
         return {'message': 'Название производителя успешно изменено.'}
     
     except HTTPException as http_exc:
@@ -520,7 +1037,7 @@ async def edit_manufactures(manufacture_id: int, new_name: str, token: str = Hea
         raise HTTPException(500, f'Ошибка при изменении названия производителя: {e}') 
 
 @app.get('/manufactures/get_manufactures_by_id/', tags=['Manufactures'])
-async def get_manufacture_by_id(manufacture_id: int, token: str = Header(...)):
+def get_manufacture_by_id(manufacture_id: int, token: str = Header(...)):
     """Получение информации о производителе по ID (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -541,18 +1058,16 @@ async def get_manufacture_by_id(manufacture_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении данных о производителе: {e}')
 
 @app.get('/manufactures/get_manufactures/', tags=['Manufactures'])
-async def get_all_manufactures(token: str = Header(...)):
+def get_all_manufactures(token: str = Header(...), if_none_match: Optional[str] = Header(None)):
     """Получение списка всех производителей"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
         raise HTTPException(401, 'Недействительный токен.')
     try:
-        manufactures = Manufactures.select()
-
-        return [{
-            'id': manufacture.id,
-            'name': manufacture.name
-        } for manufacture in manufactures]
+        return reference_response(manufactures_cache, if_none_match, lambda: [{
+            'id': manufacture_id,
+            'name': name
+        } for manufacture_id, name in manufactures_cache.items()])
     
     except HTTPException as http_exc:
         raise http_exc
@@ -561,7 +1076,7 @@ async def get_all_manufactures(token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении данных о производителях: {e}')
 
 @app.delete('/manufactures/del_manufacture_by_id/', tags=['Manufactures'])
-async def delete_manufacture(manufacture_id: int, token: str = Header(...)):
+def delete_manufacture(manufacture_id: int, token: str = Header(...)):
     """Удаление производителя (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -571,7 +1086,12 @@ async def delete_manufacture(manufacture_id: int, token: str = Header(...)):
         manufacture = Manufactures.select().where(Manufactures.id==manufacture_id).first()
         if not manufacture:
             raise HTTPException(404, 'Производитель с указанным ID не существует.')
-        manufacture.delete_instance() 
+        with db_connection.atomic():
+            component_ids = select_component_ids(Components.manufactures_id==manufacture.id)
+            manufacture.delete_instance()
+            log_component_changes(component_ids)
+        catalog_changed()
+        manufactures_cache.invalidate()
         return {'message': f'Прозводитель {manufacture.name} успешно удален.'}
     
     except HTTPException as http_exc:
@@ -581,18 +1101,17 @@ async def delete_manufacture(manufacture_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при удалении производителя: {e}')
         
 @app.get('/components_types/get_all/', tags=['Components Types'])
-async def get_all_cp(token: str = Header(...)):
+def get_all_cp(token: str = Header(...), if_none_match: Optional[str] = Header(None)):
     """Получение списка всех типов компонентов"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
         raise HTTPException(401, 'Недействительный токен.')
     
     try:
-        component_types = ComponentsTypes.select()
-        return [{
-            'name': component_type.name,
-            'description': component_type.description
-        } for component_type in component_types]
+        return reference_response(component_types_cache, if_none_match, lambda: [{
+            'name': name,
+            'description': description
+        } for _, name, description in component_types_cache.rows()])
     except HTTPException as http_exc:
         raise http_exc
     
@@ -600,7 +1119,7 @@ async def get_all_cp(token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении типов компонентов: {e}')
 
 @app.get('/components_types/get_by_id/', tags=['Components Types'])
-async def get_cp_by_id(cp_id: int, token: str = Header(...)):
+def get_cp_by_id(cp_id: int, token: str = Header(...)):
     """Получение информации о типе компонента по ID (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -623,7 +1142,7 @@ async def get_cp_by_id(cp_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении типа компонента: {e}')
 
 @app.post('/components_types/create_cp/', tags=['Components Types'])
-async def create_cp(data: ComponentsTypesCreate, token: str = Header(...)):
+def create_cp(data: ComponentsTypesCreate, token: str = Header(...)):
     """Создание нового типа компонента (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -641,6 +1160,7 @@ async def create_cp(data: ComponentsTypesCreate, token: str = Header(...)):
             name=name,
             description=description
         )
+        component_types_cache.invalidate()
         
         return {'message': 'Тип компонента успешно создан.'}
     
@@ -651,7 +1171,7 @@ async def create_cp(data: ComponentsTypesCreate, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при создании типа компонента: {e}')
 
 @app.put('/components_types/edit_cp_by_id/', tags=['Components Types'])
-async def edit_cp(cp_id: int, data: ComponentsTypesEdit, token: str = Header(...)):
+def edit_cp(cp_id: int, data: ComponentsTypesEdit, token: str = Header(...)):
     """Изменение типа компонента (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -663,9 +1183,13 @@ async def edit_cp(cp_id: int, data: ComponentsTypesEdit, token: str = Header(...
     if not component_type:
         raise HTTPException(404, 'Тип компонента с указанным ID не найден.')
     try:
-        component_type.name = new_name
-        component_type.description = description
-        component_type.save()
+        with db_connection.atomic():
+            component_type.name = new_name
+            component_type.description = description
+            component_type.save()
+            log_component_changes(select_component_ids(Components.type_id==component_type.id))
+        catalog_changed()
+        component_types_cache.invalidate()
         return {'message': 'Данные о типе компонента успешно изменены.'}
     except HTTPException as http_exc:
         raise http_exc
@@ -674,7 +1198,7 @@ async def edit_cp(cp_id: int, data: ComponentsTypesEdit, token: str = Header(...
         raise HTTPException(500, f'Ошибка при изменении типа компонента: {e}')
     
 @app.delete('/components_types/delete_cp_by_id/', tags=['Components Types'])
-async def delete_cp(cp_id: int, token: str = Header(...)):
+def delete_cp(cp_id: int, token: str = Header(...)):
     """Удаление типа компонента (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -685,7 +1209,12 @@ async def delete_cp(cp_id: int, token: str = Header(...)):
         if not component_type:
             raise HTTPException(404, 'Тип компонента с указанным ID не найден.')
         
-        component_type.delete_instance()
+        with db_connection.atomic():
+            component_ids = select_component_ids(Components.type_id==component_type.id)
+            component_type.delete_instance()
+            log_component_changes(component_ids)
+        catalog_changed()
+        component_types_cache.invalidate()
         return {'message': f'Тип компонента {component_type.name} успешно удален.'}
     except HTTPException as http_exc:
         raise http_exc
@@ -694,32 +1223,243 @@ async def delete_cp(cp_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при удалении типа компонента: {e}')    
     
 @app.get('/components/get_all/', tags=['Components'])
-async def get_all_components(token: str = Header(...)):
-    """Получение списка всех компонентов"""
+def get_all_components(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[int] = None,
+    fields: Optional[str] = None,
+    token: str = Header(...),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Получение списка всех компонентов (fields= - список нужных полей через запятую)"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
         raise HTTPException(401, 'Недействительный токен.')
 
     try:
-        components = Components.select()
-        
-        return [{
-            'id': c.id,
-            'name': c.name,
-            'type_name': c.type_id.name if c.type_id else None,
-            'manufacture_name': c.manufactures_id.name if c.manufactures_id else None,
-            'price': float(c.price),
-            'stock_quantity': c.stock_quantity,
-            'specification': c.specification
-        } for c in components]
+        selected_fields = parse_fields(fields, COMPONENT_FIELDS)
+        cache_key = (catalog_version.value, limit, after, selected_fields)
+        cached = catalog_cache.get(cache_key)
+        if cached is None:
+            rows, next_cursor = fetch_page(select_components_catalog(selected_fields), Components.id, limit, after)
+            body = encode_json({
+                'items': [component_row_to_dict(row, selected_fields) for row in rows],
+                'next_cursor': next_cursor
+            })
+            cached = (body, make_etag(body))
+            catalog_cache.set(cache_key, cached)
+        
+        body, etag = cached
+        return etag_response(body, etag, if_none_match)
         
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
         raise HTTPException(500, f'Ошибка при получении компонентов: {e}')
 
+@app.get('/components/search/', tags=['Components'])
+def search_components(
+    type_name: Optional[str] = None,
+    manufacture_name: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    q: Optional[str] = None,
+    in_stock: bool = False,
+    spec: Optional[List[str]] = Query(None),
+    sort: str = 'id',
+    fields: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    token: str = Header(...)
+):
+    """Поиск компонентов с фильтрами (spec=ключ:значение, можно несколько) и сортировкой на стороне БД (id и поле сортировки возвращаются всегда)"""
+    current_user = get_user_by_token(token, 'Пользователь')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    try:
+        if sort not in COMPONENT_SORTS:
+            raise HTTPException(400, f'Неверный вариант сортировки. Допустимые значения: {", ".join(COMPONENT_SORTS)}.')
+        
+        sort_name = COMPONENT_SORTS[sort][0]
+        selected_fields = parse_fields(fields, COMPONENT_FIELDS)
+        if sort_name not in selected_fields:
+            selected_fields = tuple(field for field in COMPONENT_FIELDS if field in selected_fields or field == sort_name)
+        
+        query = select_components_catalog(selected_fields)
+        conditions = component_search_conditions(type_name, manufacture_name, min_price, max_price, q, in_stock,
+                                                 parse_spec_filters(spec))
+        if conditions:
+            query = query.where(*conditions)
+        
+        rows, next_cursor = fetch_sorted_page(query, sort, selected_fields, limit, after)
+        return FastJSONResponse({
+            'items': [component_row_to_dict(row, selected_fields) for row in rows],
+            'next_cursor': next_cursor
+        })
+    
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        raise HTTPException(500, f'Ошибка при поиске компонентов: {e}')
+
+@app.get('/components/facets/', tags=['Components'])
+def get_components_facets(
+    type_name: Optional[str] = None,
+    manufacture_name: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    q: Optional[str] = None,
+    in_stock: bool = False,
+    spec: Optional[List[str]] = Query(None),
+    keys: Optional[List[str]] = Query(None),
+    token: str = Header(...)
+):
+    """Число компонентов по типам, производителям, ценовым диапазонам и значениям характеристик keys= для текущих фильтров"""
+    current_user = get_user_by_token(token, 'Пользователь')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    try:
+        query = Components.select()
+        conditions = component_search_conditions(type_name, manufacture_name, min_price, max_price, q, in_stock,
+                                                 parse_spec_filters(spec))
+        if conditions:
+            query = query.where(*conditions)
+        
+        types = [{'id': type_id, 'name': component_types_cache.get_name(type_id), 'count': count}
+                 for type_id, count in count_components_by(query, Components.type_id)]
+        manufacturers = [{'id': manufacture_id, 'name': manufactures_cache.get_name(manufacture_id), 'count': count}
+                         for manufacture_id, count in count_components_by(query, Components.manufactures_id)]
+        
+        bucket_counts = dict(count_components_by(query, price_bucket_expression()))
+        bounds = PRICE_BUCKETS + [None]
+        price_buckets = [{'min': bounds[index], 'max': bounds[index + 1], 'count': bucket_counts[index]}
+                         for index in range(len(PRICE_BUCKETS)) if bucket_counts.get(index)]
+        
+        specification = {}
+        attribute_keys = list(dict.fromkeys(normalize_attribute_key(key) for key in keys or [] if key.strip()))
+        if attribute_keys:
+            specification = {key: [] for key in attribute_keys}
+            attribute_counts = (ComponentsAttributes
+                                .select(ComponentsAttributes.key, ComponentsAttributes.value,
+                                        fn.COUNT(fn.DISTINCT(ComponentsAttributes.component_id)))
+                                .where(
+                                    ComponentsAttributes.key.in_(attribute_keys) &
+                                    ComponentsAttributes.component_id.in_(query.select(Components.id))
+                                )
+                                .group_by(ComponentsAttributes.key, ComponentsAttributes.value)
+                                .tuples())
+            for key, value, count in attribute_counts:
+                specification[key].append({'value': value, 'count': count})
+        
+        by_count = lambda item: (-item['count'], str(item.get('name', item.get('value'))))
+        return FastJSONResponse({
+            'total': sum(item['count'] for item in types),
+            'types': sorted(types, key=by_count),
+            'manufacturers': sorted(manufacturers, key=by_count),
+            'price_buckets': price_buckets,
+            'specification': {key: sorted(values, key=by_count) for key, values in specification.items()}
+        })
+    
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        raise HTTPException(500, f'Ошибка при получении фасетов каталога: {e}')
+
+@app.get('/components/text_search/', tags=['Components'])
+def text_search_components(
+    q: str,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_LIMIT),
+    fields: Optional[str] = None,
+    token: str = Header(...)
+):
+    """Полнотекстовый поиск компонентов по названию, типу, производителю и характеристикам с ранжированием и поиском по началу слова"""
+    current_user = get_user_by_token(token, 'Пользователь')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    try:
+        text_search = select_text_search(q)
+        if text_search is None:
+            return FastJSONResponse({'items': []})
+        
+        ranking = list(text_search
+                       .order_by(SQL('rank').desc(), ComponentsSearchIndex.component_id)
+                       .limit(limit)
+                       .tuples())
+        ranks = dict(ranking)
+        
+        selected_fields = parse_fields(fields, COMPONENT_FIELDS)
+        rows = select_components_catalog(selected_fields).where(Components.id.in_(list(ranks)))
+        components = {row[0]: component_row_to_dict(row, selected_fields) for row in rows}
+        
+        return FastJSONResponse({
+            'items': [{**components[component_id], 'rank': rank}
+                      for component_id, rank in ranking if component_id in components]
+        })
+    
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        raise HTTPException(500, f'Ошибка при полнотекстовом поиске компонентов: {e}')
+
+@app.get('/components/export/', tags=['Components'])
+def export_components(export_format: str = Query('ndjson', alias='format'), token: str = Header(...)):
+    """Потоковая выгрузка всех компонентов в NDJSON или CSV (только для администратора)"""
+    current_user = get_user_by_token(token, 'Администратор')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    return export_response(select_components_catalog(), Components.id, tuple(COMPONENT_FIELDS), export_format, 'components')
+
+@app.get('/components/changes/', tags=['Components'])
+def get_components_changes(since: int = Query(0, ge=0), token: str = Header(...)):
+    """Изменения каталога компонентов после указанной версии (since=0 - весь каталог)"""
+    current_user = get_user_by_token(token, 'Пользователь')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    try:
+        version = ComponentsChangeLog.select(fn.MAX(ComponentsChangeLog.version)).scalar() or 0
+        
+        if since == 0:
+            return FastJSONResponse({
+                'version': version,
+                'changed': [component_row_to_dict(row) for row in select_components_catalog()],
+                'deleted': []
+            })
+        
+        changed_ids = (ComponentsChangeLog
+                       .select(ComponentsChangeLog.component_id)
+                       .where(ComponentsChangeLog.version > since)
+                       .distinct())
+        changed = [component_row_to_dict(row)
+                   for row in select_components_catalog().where(Components.id.in_(changed_ids))]
+        
+        deleted_ids = (ComponentsChangeLog
+                       .select(ComponentsChangeLog.component_id)
+                       .where(
+                           (ComponentsChangeLog.version > since) &
+                           (ComponentsChangeLog.action=='delete')
+                       )
+                       .distinct()
+                       .tuples())
+        present_ids = {component['id'] for component in changed}
+        deleted = sorted(component_id for component_id, in deleted_ids if component_id not in present_ids)
+        
+        return FastJSONResponse({
+            'version': version,
+            'changed': changed,
+            'deleted': deleted
+        })
+    
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        raise HTTPException(500, f'Ошибка при получении изменений каталога: {e}')
+
 @app.get('/components/get_by_id/', tags=['Components'])
-async def get_component_by_id(component_id: int, token: str = Header(...)):
+def get_component_by_id(component_id: int, token: str = Header(...)):
     """Получение информации о компоненте по ID"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -745,7 +1485,7 @@ async def get_component_by_id(component_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении компонента: {e}')
 
 @app.post('/components/create/', tags=['Components'])
-async def create_component(data: ComponentCreate, token: str = Header(...)):
+def create_component(data: ComponentCreate, token: str = Header(...)):
     """Создание нового компонента (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -759,14 +1499,17 @@ async def create_component(data: ComponentCreate, token: str = Header(...)):
         component_type = get_component_type_by_name(data.type_name) if data.type_name else None
         manufacture = get_manufacture_by_name(data.manufacture_name) if data.manufacture_name else None
         
-        Components.create(
-            name=data.name,
-            type_id=component_type.id if component_type else None,
-            manufactures_id=manufacture.id if manufacture else None,
-            price=data.price,
-            stock_quantity=data.stock_quantity,
-            specification=data.specification
-        )
+        with db_connection.atomic():
+            component = Components.create(
+                name=data.name,
+                type_id=component_type.id if component_type else None,
+                manufactures_id=manufacture.id if manufacture else None,
+                price=data.price,
+                stock_quantity=data.stock_quantity,
+                specification=data.specification
+            )
+            log_component_changes([component.id])
+        catalog_changed()
         
         return {'message': 'Компонент успешно создан.'}
     
@@ -776,7 +1519,7 @@ async def create_component(data: ComponentCreate, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при создании компонента: {e}')
 
 @app.put('/components/edit_by_id/', tags=['Components'])
-async def edit_component(component_id: int, data: ComponentsEdit, token: str = Header(...)):
+def edit_component(component_id: int, data: ComponentsEdit, token: str = Header(...)):
     """Изменение компонента (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -813,7 +1556,14 @@ async def edit_component(component_id: int, data: ComponentsEdit, token: str = H
         if data.specification is not None:
             component.specification = data.specification
         
-        component.save()
+        # Цена и остаток не входят ни в поисковый индекс, ни в характеристики, ни в правила совместимости
+        reindex = any(value is not None for value in (data.new_name, data.type_name, data.manufacture_name, data.specification))
+        with db_connection.atomic():
+            component.save()
+            log_component_changes([component.id], reindex=reindex)
+            if data.price is not None:
+                update_configuration_totals(select_component_configuration_ids([component.id]))
+        catalog_changed()
         
         return {'message': 'Данные о компоненте успешно изменены.'}
     
@@ -824,7 +1574,7 @@ async def edit_component(component_id: int, data: ComponentsEdit, token: str = H
         raise HTTPException(500, f'Ошибка при изменении компонента: {e}')
 
 @app.delete('/components/delete_by_id/', tags=['Components'])
-async def delete_component(component_id: int, token: str = Header(...)):
+def delete_component(component_id: int, token: str = Header(...)):
     """Удаление компонента (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -836,7 +1586,12 @@ async def delete_component(component_id: int, token: str = Header(...)):
             raise HTTPException(404, 'Компонент с указанным ID не найден.')
         
         component_name = component.name
-        component.delete_instance()
+        with db_connection.atomic():
+            config_ids = [config_id for config_id, in select_component_configuration_ids([component_id]).tuples()]
+            component.delete_instance()
+            log_component_changes([component_id], 'delete')
+            update_configuration_totals(config_ids)
+        catalog_changed()
         
         return {'message': f'Компонент {component_name} успешно удален.'}
     
@@ -846,27 +1601,39 @@ async def delete_component(component_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при удалении компонента: {e}')
 
 @app.get('/configurations/get_all/', tags=['Configurations'])
-async def get_all_configurations(token: str = Header(...)):
+def get_all_configurations(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[int] = None,
+    token: str = Header(...)
+):
     """Получение всех конфигураций текущего пользователя"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
         raise HTTPException(401, 'Недействительный токен.')
     
     try:
-        configurations = Configurations.select().where(Configurations.user_id==current_user.id)
-        return [{
-            'id': config.id,
-            'name_config': config.name_config,
-            'description': config.description,
-            'created_at': config.created_at.isoformat() if config.created_at else None
-        } for config in configurations]
+        configurations, next_cursor = fetch_page(
+            Configurations.select().where(Configurations.user_id==current_user.id),
+            Configurations.id, limit, after
+        )
+        return FastJSONResponse({
+            'items': [{
+                'id': config.id,
+                'name_config': config.name_config,
+                'description': config.description,
+                'created_at': config.created_at,
+                'total_price': config.total_price,
+                'items_count': config.items_count
+            } for config in configurations],
+            'next_cursor': next_cursor
+        })
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
         raise HTTPException(500, f'Ошибка при получении конфигураций: {e}')
     
 @app.get('/configurations/get_by_id/', tags=['Configurations'])
-async def get_configuration_by_id(config_id: int, token: str = Header(...)):
+def get_configuration_by_id(config_id: int, token: str = Header(...)):
     """Получение конфигурации по ID для текущего пользователя"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -885,7 +1652,9 @@ async def get_configuration_by_id(config_id: int, token: str = Header(...)):
             'id': configuration.id,
             'name_config': configuration.name_config,
             'description': configuration.description,
-            'created_at': configuration.created_at.isoformat() if configuration.created_at else None
+            'created_at': configuration.created_at.isoformat() if configuration.created_at else None,
+            'total_price': configuration.total_price,
+            'items_count': configuration.items_count
         }
     except HTTPException as http_exc:
         raise http_exc
@@ -893,7 +1662,7 @@ async def get_configuration_by_id(config_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении конфигурации: {e}')
 
 @app.post('/configurations/create/', tags=['Configurations'])
-async def create_configuration(data: ConfigurationCreate, token: str = Header(...)):
+def create_configuration(data: ConfigurationCreate, token: str = Header(...)):
     """Создание новой конфигурации"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -922,7 +1691,7 @@ async def create_configuration(data: ConfigurationCreate, token: str = Header(..
         raise HTTPException(500, f'Ошибка при создании конфигурации: {e}')
 
 @app.put('/configurations/edit_by_id/', tags=['Configurations'])
-async def edit_configuration(config_id: int, data: ConfigurationEdit, token: str = Header(...)):
+def edit_configuration(config_id: int, data: ConfigurationEdit, token: str = Header(...)):
     """Изменение конфигурации текущего пользователя"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -960,7 +1729,7 @@ async def edit_configuration(config_id: int, data: ConfigurationEdit, token: str
         raise HTTPException(500, f'Ошибка при изменении конфигурации: {e}')
 
 @app.delete('/configurations/delete_by_id/', tags=['Configurations'])
-async def delete_configuration(config_id: int, token: str = Header(...)):
+def delete_configuration(config_id: int, token: str = Header(...)):
     """Удаление конфигурации текущего пользователя"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -985,29 +1754,41 @@ async def delete_configuration(config_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при удалении конфигурации: {e}')
 
 @app.get('/configurations/admin/get_all/', tags=['Configurations'])
-async def admin_get_all_configurations(token: str = Header(...)):
+def admin_get_all_configurations(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[int] = None,
+    token: str = Header(...)
+):
     """Получение всех конфигураций (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
         raise HTTPException(401, 'Недействительный токен.')
     
     try:
-        configurations = Configurations.select()
-        return [{
-            'id': config.id,
-            'user_id': config.user_id.id,
-            'user_name': config.user_id.email,
-            'name_config': config.name_config,
-            'description': config.description,
-            'created_at': config.created_at.isoformat() if config.created_at else None
-        } for config in configurations]
+        configurations, next_cursor = fetch_page(
+            Configurations.select(Configurations, Users.id, Users.email).join(Users),
+            Configurations.id, limit, after
+        )
+        return FastJSONResponse({
+            'items': [{
+                'id': config.id,
+                'user_id': config.user_id.id,
+                'user_name': config.user_id.email,
+                'name_config': config.name_config,
+                'description': config.description,
+                'created_at': config.created_at,
+                'total_price': config.total_price,
+                'items_count': config.items_count
+            } for config in configurations],
+            'next_cursor': next_cursor
+        })
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
         raise HTTPException(500, f'Ошибка при получении конфигураций: {e}')
 
 @app.delete('/configurations/admin/delete_by_id/', tags=['Configurations'])
-async def admin_delete_configuration(config_id: int, token: str = Header(...)):
+def admin_delete_configuration(config_id: int, token: str = Header(...)):
     """Удаление любой конфигурации (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -1035,8 +1816,41 @@ async def admin_delete_configuration(config_id: int, token: str = Header(...)):
     except Exception as e:
         raise HTTPException(500, f'Ошибка при удалении конфигурации: {e}')
 
+@app.get('/configurations/admin/compatibility/', tags=['Configurations'])
+def admin_check_configurations_compatibility(
+    only_incompatible: bool = False,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[int] = None,
+    token: str = Header(...)
+):
+    """Пакетная проверка совместимости всех конфигураций (только для администратора)"""
+    current_user = get_user_by_token(token, 'Администратор')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    try:
+        configurations, next_cursor = fetch_page(
+            Configurations.select(Configurations.id, Configurations.name_config).tuples(),
+            Configurations.id, limit, after
+        )
+        results = check_configurations([config_id for config_id, _ in configurations])
+        
+        items = []
+        for config_id, name_config in configurations:
+            report = compatibility_report(results[config_id])
+            if only_incompatible and report['compatible']:
+                continue
+            items.append({'configuration_id': config_id, 'name_config': name_config, **report})
+        
+        return FastJSONResponse({'items': items, 'next_cursor': next_cursor})
+    
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        raise HTTPException(500, f'Ошибка при проверке совместимости конфигураций: {e}')
+
 @app.get('/configurations/admin/get_by_id/', tags=['Configurations'])
-async def admin_get_configuration_by_id(config_id: int, token: str = Header(...)):
+def admin_get_configuration_by_id(config_id: int, token: str = Header(...)):
     """Получение любой конфигурации по ID (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -1054,7 +1868,9 @@ async def admin_get_configuration_by_id(config_id: int, token: str = Header(...)
             'user_login': configuration.user_id.email,
             'name_config': configuration.name_config,
             'description': configuration.description,
-            'created_at': configuration.created_at.isoformat() if configuration.created_at else None
+            'created_at': configuration.created_at.isoformat() if configuration.created_at else None,
+            'total_price': configuration.total_price,
+            'items_count': configuration.items_count
         }
     except HTTPException as http_exc:
         raise http_exc
@@ -1062,7 +1878,7 @@ async def admin_get_configuration_by_id(config_id: int, token: str = Header(...)
         raise HTTPException(500, f'Ошибка при получении конфигурации: {e}')
 
 @app.get('/configurations/{config_id}/components/', tags=['Configurations Components'])
-async def get_configuration_components(config_id: int, token: str = Header(...)):
+def get_configuration_components(config_id: int, token: str = Header(...)):
     """Получение всех компонентов конфигурации"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -1077,20 +1893,7 @@ async def get_configuration_components(config_id: int, token: str = Header(...))
         if not configuration:
             raise HTTPException(404, 'Конфигурация не найдена или у вас нет к ней доступа.')
         
-        config_components = ConfigurationsComponents.select().where(
-            ConfigurationsComponents.configuration_id==config_id
-        )
-        
-        return [{
-            'id': cc.id,
-            'component_id': cc.components_id.id,
-            'component_name': cc.components_id.name,
-            'type_name': cc.components_id.type_id.name if cc.components_id.type_id else None,
-            'manufacture_name': cc.components_id.manufactures_id.name if cc.components_id.manufactures_id else None,
-            'price': float(cc.components_id.price),
-            'quantity': cc.quantity,
-            'total_price': float(cc.components_id.price * cc.quantity)
-        } for cc in config_components]
+        return FastJSONResponse(get_configuration_components_list(config_id))
     
     except HTTPException as http_exc:
         raise http_exc
@@ -1098,7 +1901,7 @@ async def get_configuration_components(config_id: int, token: str = Header(...))
         raise HTTPException(500, f'Ошибка при получении компонентов конфигурации: {e}')      
 
 @app.post('/configurations/{config_id}/components/', tags=['Configurations Components'])
-async def add_component_to_configuration(
+def add_component_to_configuration(
     config_id: int, 
     data: ConfigComponentCreate, 
     token: str = Header(...)
@@ -1129,21 +1932,104 @@ async def add_component_to_configuration(
         if existing_component:
             raise HTTPException(400, 'Этот компонент уже есть в конфигурации.')
 
-        ConfigurationsComponents.create(
-            configuration_id=config_id,
-            components_id=component.id,
-            quantity=data.quantity
-        )
+        problems = check_configuration(config_id, [(component.id, data.quantity)])
+        with db_connection.atomic():
+            ConfigurationsComponents.create(
+                configuration_id=config_id,
+                components_id=component.id,
+                quantity=data.quantity
+            )
+            update_configuration_totals([config_id])
         
-        return {'message': f'Компонент "{data.component_name}" успешно добавлен в конфигурацию.'}
+        return {
+            'message': f'Компонент "{data.component_name}" успешно добавлен в конфигурацию.',
+            'compatibility': compatibility_report(problems)
+        }
     
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
         raise HTTPException(500, f'Ошибка при добавлении компонента: {e}')
 
+@app.get('/configurations/{config_id}/compatibility/', tags=['Configurations Components'])
+def get_configuration_compatibility(config_id: int, token: str = Header(...)):
+    """Проверка совместимости компонентов конфигурации текущего пользователя"""
+    current_user = get_user_by_token(token, 'Пользователь')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    try:
+        configuration = Configurations.select(Configurations.id).where(
+            (Configurations.id==config_id) &
+            (Configurations.user_id==current_user.id)
+        ).first()
+        
+        if not configuration:
+            raise HTTPException(404, 'Конфигурация не найдена или у вас нет к ней доступа.')
+        
+        return {'configuration_id': config_id, **compatibility_report(check_configuration(config_id))}
+    
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        raise HTTPException(500, f'Ошибка при проверке совместимости конфигурации: {e}')
+
+@app.get('/configurations/{config_id}/compatible_components/', tags=['Configurations Components'])
+def get_compatible_components(
+    config_id: int,
+    type_name: Optional[str] = Query(None, alias='type'),
+    fields: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[int] = None,
+    token: str = Header(...)
+):
+    """Компоненты, совместимые с уже добавленными в конфигурацию: по индексу несовместимых пар, мощности блока питания и единственным в сборке типам"""
+    current_user = get_user_by_token(token, 'Пользователь')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    try:
+        configuration = Configurations.select(Configurations.id).where(
+            (Configurations.id==config_id) &
+            (Configurations.user_id==current_user.id)
+        ).first()
+        
+        if not configuration:
+            raise HTTPException(404, 'Конфигурация не найдена или у вас нет к ней доступа.')
+        
+        selected_fields = parse_fields(fields, COMPONENT_FIELDS)
+        query = select_components_catalog(selected_fields)
+        if type_name:
+            type_id = component_types_cache.get_id(type_name)
+            query = query.where(Components.type_id.in_([type_id] if type_id is not None else []))
+        
+        items = configuration_items([config_id])[config_id]
+        if items:
+            component_ids = [component_id for component_id, _ in items]
+            query = query.where(
+                Components.id.not_in(component_ids) &
+                Components.id.not_in(select_incompatible_ids(component_ids))
+            )
+            single_part_type_ids = filled_single_part_type_ids(component_ids)
+            if single_part_type_ids:
+                query = query.where(Components.type_id.is_null() | Components.type_id.not_in(single_part_type_ids))
+            underpowered_psu_ids = select_underpowered_psu_ids(items)
+            if underpowered_psu_ids is not None:
+                query = query.where(Components.id.not_in(underpowered_psu_ids))
+        
+        rows, next_cursor = fetch_page(query, Components.id, limit, after)
+        return FastJSONResponse({
+            'items': [component_row_to_dict(row, selected_fields) for row in rows],
+            'next_cursor': next_cursor
+        })
+    
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        raise HTTPException(500, f'Ошибка при подборе совместимых компонентов: {e}')
+
 @app.put('/configurations/{config_id}/components/{component_id}/', tags=['Configurations Components'])
-async def update_configuration_component(
+def update_configuration_component(
     config_id: int, 
     component_id: int, 
     data: ConfigComponentEdit, 
@@ -1170,7 +2056,9 @@ async def update_configuration_component(
             raise HTTPException(404, 'Компонент не найден в данной конфигурации.')
         
         config_component.quantity = data.quantity
-        config_component.save()
+        with db_connection.atomic():
+            config_component.save()
+            update_configuration_totals([config_id])
         
         return {'message': 'Количество компонента успешно изменено.'}
     except HTTPException as http_exc:
@@ -1180,7 +2068,7 @@ async def update_configuration_component(
         raise HTTPException(500, f'Не удалось изменить количество компонента в конфигурации: {e}')
 
 @app.delete('/configurations/{config_id}/components/{component_id}/', tags=['Configurations Components'])
-async def delete_component_in_configuration(
+def delete_component_in_configuration(
     config_id: int,
     component_id: int,
     token: str = Header(...)
@@ -1207,7 +2095,9 @@ async def delete_component_in_configuration(
             raise HTTPException(404, 'Компонент не найден в данной конфигурации.')
         
         component_name = config_component.components_id.name
-        config_component.delete_instance()
+        with db_connection.atomic():
+            config_component.delete_instance()
+            update_configuration_totals([config_id])
         
         return {'message': f'Компонент {component_name} успешно удален.'}
     
@@ -1218,7 +2108,7 @@ async def delete_component_in_configuration(
         raise HTTPException(500, f'Не удалось удалить компонент из конфигурации: {e}')
 
 @app.get('/configurations/admin/{config_id}/components/', tags=['Configurations Components'])
-async def admin_get_configuration_components(config_id: int, token: str = Header(...)):
+def admin_get_configuration_components(config_id: int, token: str = Header(...)):
     """Получение компонентов любой конфигурации (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -1228,19 +2118,8 @@ async def admin_get_configuration_components(config_id: int, token: str = Header
         config = Configurations.select().where(Configurations.id==config_id).first()
         if not config:
             raise HTTPException(404, 'Не удалось найти конфигурацию.')
-        configuration_components = ConfigurationsComponents.select().where(ConfigurationsComponents.configuration_id==config_id)
         
-        return [
-            {
-                'id': cc.id,
-                'component_id': cc.components_id.id,
-                'component_name': cc.components_id.name,
-                'type_name': cc.components_id.type_id.name if cc.components_id.type_id else None,
-                'manufacture_name': cc.components_id.manufactures_id.name if cc.components_id.manufactures_id else None,
-                'price': float(cc.components_id.price),
-                'quantity': cc.quantity,
-                'total_price': float(cc.components_id.price * cc.quantity)
-            } for cc in configuration_components]
+        return FastJSONResponse(get_configuration_components_list(config_id))
         
     except HTTPException as http_exc:
         raise http_exc
@@ -1249,7 +2128,7 @@ async def admin_get_configuration_components(config_id: int, token: str = Header
         raise HTTPException(500, f'Ошибка при получении компонентов конфигурации: {e}') 
 
 @app.delete('/configurations/admin/{config_id}/components/{component_id}/', tags=['Configurations Components'])
-async def admin_remove_component_from_configuration(
+def admin_remove_component_from_configuration(
     config_id: int, 
     component_id: int, 
     token: str = Header(...)
@@ -1271,7 +2150,9 @@ async def admin_remove_component_from_configuration(
         component_name = config_component.components_id.name
         user_login = config_component.configuration_id.user_id.email
         
-        config_component.delete_instance()
+        with db_connection.atomic():
+            config_component.delete_instance()
+            update_configuration_totals([config_id])
         
         return {
             'message': f'Компонент "{component_name}" успешно удален из конфигурации пользователя {user_login}.',
@@ -1285,18 +2166,17 @@ async def admin_remove_component_from_configuration(
         raise HTTPException(500, f'Ошибка при удалении компонента: {e}')
 
 @app.get('/order_status/get_all/', tags=['Orders Statuses'])
-async def get_all_statuses(token: str = Header(...)):
+def get_all_statuses(token: str = Header(...), if_none_match: Optional[str] = Header(None)):
     """Получение всех статусов заказа"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
         raise HTTPException(401, 'Недействительный токен.')
     
     try:
-        statuses = OrdersStatus.select()
-        return [{
-            'id': status.id,
-            'name': status.name
-        } for status in statuses]
+        return reference_response(statuses_cache, if_none_match, lambda: [{
+            'id': status_id,
+            'name': name
+        } for status_id, name in statuses_cache.items()])
         
     except HTTPException as http_exc:
         raise http_exc
@@ -1305,7 +2185,7 @@ async def get_all_statuses(token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении статусов заказов: {e}')
 
 @app.post('/order_status/create_status/', tags=['Orders Statuses'])
-async def create_order_status(name: str, token: str = Header(...)):
+def create_order_status(name: str, token: str = Header(...)):
     """Создание нового статуса заказа (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -1316,6 +2196,7 @@ async def create_order_status(name: str, token: str = Header(...)):
         if existing_status:
             raise HTTPException(400, 'Статус с таким названием уже существует.')
         OrdersStatus.create(name=name)
+        statuses_cache.invalidate()
         return {'message': 'Статус заказа успешно создан.'}
     
     except HTTPException as http_exc:
@@ -1325,7 +2206,7 @@ async def create_order_status(name: str, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при создании статуса заказа: {e}')       
 
 @app.put('/status_order/edit_status', tags=['Orders Statuses'])
-async def edit_order_status(id: int, new_name: str, token: str = Header(...)):
+def edit_order_status(id: int, new_name: str, token: str = Header(...)):
     """Изменение статуса заказа (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -1340,6 +2221,7 @@ async def edit_order_status(id: int, new_name: str, token: str = Header(...)):
             raise HTTPException(403, f'Статус с заказа {existing_status.name} уже существует.')
         status.name = new_name
         status.save()
+        statuses_cache.invalidate()
         return {'message': 'Статус заказа успешно изменен.'}
     except HTTPException as http_exc:
         raise http_exc
@@ -1348,7 +2230,7 @@ async def edit_order_status(id: int, new_name: str, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при изменении статуса заказа: {e}') 
 
 @app.delete('/status_order/delete_status', tags=['Orders Statuses'])
-async def delete_order_status(id: int, token: str = Header(...)):
+def delete_order_status(id: int, token: str = Header(...)):
     """Удаление статуса заказа (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -1359,6 +2241,7 @@ async def delete_order_status(id: int, token: str = Header(...)):
             raise HTTPException(404, 'Статус заказа с указанным ID не найден.')
         
         status.delete_instance()
+        statuses_cache.invalidate()
         return {'message': 'Статус заказа успешно удален.'}
     
     except HTTPException as http_exc:
@@ -1368,40 +2251,34 @@ async def delete_order_status(id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при изменении статуса заказа: {e}') 
 
 @app.get('/orders/get_user_orders/', tags=['Orders'])
-async def get_user_orders(token: str = Header(...)):
+def get_user_orders(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[int] = None,
+    token: str = Header(...)
+):
     """Получение заказов текущего пользователя"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
         raise HTTPException(401, 'Недействительный токен.')
     
     try:
-        orders = Orders.select().where(Orders.user_id==current_user.id)
+        orders, next_cursor = fetch_page(
+            Orders.select(Orders, OrdersStatus).join(OrdersStatus).where(Orders.user_id==current_user.id),
+            Orders.id, limit, after
+        )
+        configs_map = get_order_configurations_map([order.id for order in orders])
         
-        result = []
-        for order in orders:
-            order_configs = OrderConfigurations.select().where(
-                OrderConfigurations.order_id==order.id
-            )
-            
-            configs_list = []
-            for oc in order_configs:
-                configs_list.append({
-                    'configuration_id': oc.configuration_id.id,
-                    'configuration_name': oc.configuration_id.name_config,
-                    'quantity': oc.quantity,
-                    'price_at_time': float(oc.price_at_time)
-                })
-            
-            result.append({
+        return FastJSONResponse({
+            'items': [{
                 'id': order.id,
-                'order_date': order.order_date.isoformat(),
-                'total_amount': float(order.total_amout),
+                'order_date': order.order_date,
+                'total_amount': order.total_amout,
                 'status_id': order.status_id.id,
                 'status_name': order.status_id.name,
-                'configurations': configs_list
-            })
-        
-        return result
+                'configurations': configs_map[order.id]
+            } for order in orders],
+            'next_cursor': next_cursor
+        })
     
     except HTTPException as http_exc:
         raise http_exc
@@ -1410,7 +2287,7 @@ async def get_user_orders(token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении заказов: {e}')
 
 @app.put('/orders/user/update_order_status/', tags=['Orders'])
-async def user_update_order_status(order_id: int, new_status: str, token: str = Header(...)):
+def user_update_order_status(order_id: int, new_status: str, token: str = Header(...)):
     """Изменение статуса заказа пользователем (только на "Оплачен")"""
     current_user = get_user_by_token(token, 'Пользователь')
     
@@ -1426,11 +2303,11 @@ async def user_update_order_status(order_id: int, new_status: str, token: str =
         if new_status != 'Оплачен':
             raise HTTPException(403, 'Вы можете изменить статус только на "Оплачен"')
         
-        status = OrdersStatus.get_or_none(OrdersStatus.name == new_status)
-        if not status:
+        status_id = statuses_cache.get_id(new_status)
+        if status_id is None:
             raise HTTPException(404, 'Статус не найден.')
         
-        order.status_id = status.id
+        order.status_id = status_id
         order.save()
         
         return {
@@ -1445,7 +2322,7 @@ async def user_update_order_status(order_id: int, new_status: str, token: str =
         raise HTTPException(500, f'Ошибка при изменении статуса заказа: {e}')
 
 @app.get('/orders/get_order_by_id/', tags=['Orders'])
-async def get_order_detail(order_id: int, token: str = Header(...)):
+def get_order_detail(order_id: int, token: str = Header(...)):
     """Получение деталей заказа по ID"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -1489,7 +2366,7 @@ async def get_order_detail(order_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении заказа: {e}')
 
 @app.post('/orders/create_order/', tags=['Orders'])
-async def create_order(data: OrderCreate, token: str = Header(...)):
+def create_order(data: OrderCreate, token: str = Header(...)):
     """Создание нового заказа на основе конфигурации"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -1504,29 +2381,22 @@ async def create_order(data: OrderCreate, token: str = Header(...)):
         if not configuration:
             raise HTTPException(404, 'Конфигурация не найдена или у вас нет к ней доступа.')
 
-        config_components = ConfigurationsComponents.select().where(
-            ConfigurationsComponents.configuration_id==data.configuration_id
-        )
-        
-        if not config_components:
+        if not configuration.items_count:
             raise HTTPException(400, 'Конфигурация пустая. Добавьте компоненты перед созданием заказа.')
         
-        total_amount = Decimal('0')
-        for cc in config_components:
-            total_amount += cc.components_id.price * cc.quantity
-        
-        total_amount *= data.quantity
+        total_amount = configuration.total_price * data.quantity
 
-        status = OrdersStatus.get_or_none(OrdersStatus.name=='В обработке')
-        if not status:
-            status = OrdersStatus.select().first()
-            if not status:
+        status_id = statuses_cache.get_id('В обработке')
+        if status_id is None:
+            statuses = statuses_cache.items()
+            if not statuses:
                 raise HTTPException(500, 'Не найден статус заказа.')
+            status_id = statuses[0][0]
 
         order = Orders.create(
             user_id=current_user.id,
             total_amout=total_amount,
-            status_id=status.id
+            status_id=status_id
         )
 
         OrderConfigurations.create(
@@ -1548,7 +2418,7 @@ async def create_order(data: OrderCreate, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при создании заказа: {e}')
 
 @app.delete('/orders/cancel_order/', tags=['Orders'])
-async def cancel_order(order_id: int, token: str = Header(...)):
+def cancel_order(order_id: int, token: str = Header(...)):
     """Отмена заказа пользователем"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -1573,43 +2443,55 @@ async def cancel_order(order_id: int, token: str = Header(...)):
     except Exception as e:
         raise HTTPException(500, f'Ошибка при отмене заказа: {e}')
 
+@app.get('/orders/admin/export/', tags=['Orders'])
+def admin_export_orders(export_format: str = Query('ndjson', alias='format'), token: str = Header(...)):
+    """Потоковая выгрузка всех заказов в NDJSON или CSV (только для администратора)"""
+    current_user = get_user_by_token(token, 'Администратор')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    query = (Orders
+             .select(Orders.id, Users.id, Users.email, Orders.order_date, Orders.total_amout, OrdersStatus.name)
+             .join(OrdersStatus)
+             .switch(Orders)
+             .join(Users)
+             .tuples())
+    return export_response(query, Orders.id, ORDER_EXPORT_FIELDS, export_format, 'orders')
+
 @app.get('/orders/admin/get_all', tags=['Orders'])
-async def admin_get_all_orders(token: str = Header(...)):
+def admin_get_all_orders(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[int] = None,
+    token: str = Header(...)
+):
     """Получение всех заказов (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
         raise HTTPException(401, 'Недействительный токен.')
     
     try:
-        orders = Orders.select()
+        orders, next_cursor = fetch_page(
+            Orders.select(Orders, OrdersStatus, Users.id, Users.email)
+                  .join(OrdersStatus)
+                  .switch(Orders)
+                  .join(Users),
+            Orders.id, limit, after
+        )
+        configs_map = get_order_configurations_map([order.id for order in orders])
         
-        result = []
-        for order in orders:
-            order_configs = OrderConfigurations.select().where(
-                OrderConfigurations.order_id==order.id
-            )
-            
-            configs_list = []
-            for oc in order_configs:
-                configs_list.append({
-                    'configuration_id': oc.configuration_id.id,
-                    'configuration_name': oc.configuration_id.name_config,
-                    'quantity': oc.quantity,
-                    'price_at_time': float(oc.price_at_time)
-                })
-            
-            result.append({
+        return FastJSONResponse({
+            'items': [{
                 'id': order.id,
                 'user_id': order.user_id.id,
                 'user_login': order.user_id.email,
-                'order_date': order.order_date.isoformat(),
-                'total_amount': float(order.total_amout),
+                'order_date': order.order_date,
+                'total_amount': order.total_amout,
                 'status_id': order.status_id.id,
                 'status_name': order.status_id.name,
-                'configurations': configs_list
-            })
-        
-        return result
+                'configurations': configs_map[order.id]
+            } for order in orders],
+            'next_cursor': next_cursor
+        })
     
     except HTTPException as http_exc:
         raise http_exc
@@ -1618,7 +2500,7 @@ async def admin_get_all_orders(token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении заказов: {e}')
 
 @app.put('/orders/admin/edit_order_status/', tags=['Orders'])
-async def admin_update_order_status(order_id: int, data: OrderStatusUpdate, token: str = Header(...)):
+def admin_update_order_status(order_id: int, data: OrderStatusUpdate, token: str = Header(...)):
     """Изменение статуса заказа (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -1629,17 +2511,17 @@ async def admin_update_order_status(order_id: int, data: OrderStatusUpdate, toke
         if not order:
             raise HTTPException(404, 'Заказ не найден.')
         
-        status = OrdersStatus.get_or_none(OrdersStatus.id==data.status_id)
-        if not status:
+        status_name = statuses_cache.get_name(data.status_id)
+        if status_name is None:
             raise HTTPException(404, 'Статус с указанным ID не найден.')
         
         order.status_id = data.status_id
         order.save()
         
         return {
-            'message': f'Статус заказа #{order_id} изменен на "{status.name}".',
+            'message': f'Статус заказа #{order_id} изменен на "{status_name}".',
             'order_id': order_id,
-            'new_status': status.name
+            'new_status': status_name
         }
     
     except HTTPException as http_exc:
@@ -1648,7 +2530,7 @@ async def admin_update_order_status(order_id: int, data: OrderStatusUpdate, toke
         raise HTTPException(500, f'Ошибка при изменении статуса заказа: {e}')
 
 @app.delete('/orders/admin/delete_order/', tags=['Orders'])
-async def admin_delete_order(order_id: int, token: str = Header(...)):
+def admin_delete_order(order_id: int, token: str = Header(...)):
     """Удаление заказа (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -1677,7 +2559,7 @@ async def admin_delete_order(order_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при удалении заказа: {e}')
 
 @app.get('/order_configurations/get_user_order_config/', tags=['Order Configurations'])
-async def get_order_configurations(order_id: int, token: str = Header(...)):
+def get_order_configurations(order_id: int, token: str = Header(...)):
     """Получение конфигураций заказа для текущего пользователя"""
     current_user = get_user_by_token(token, 'Пользователь')
     if not current_user:
@@ -1715,7 +2597,7 @@ async def get_order_configurations(order_id: int, token: str = Header(...)):
         raise HTTPException(500, f'Ошибка при получении конфигураций заказа: {e}')
     
 @app.post('/order_configurations/admin/create_config_in_order/', tags=['Order Configurations'])
-async def add_configuration_to_order(
+def add_configuration_to_order(
     order_id: int, 
     data: OrderConfigCreate, 
     token: str = Header(...)
@@ -1745,16 +2627,10 @@ async def add_configuration_to_order(
         if existing_config:
             raise HTTPException(400, 'Эта конфигурация уже есть в заказе.')
 
-        config_components = ConfigurationsComponents.select().where(
-            ConfigurationsComponents.configuration_id == data.configuration_id
-        )
-        
-        if not config_components:
+        if not configuration.items_count:
             raise HTTPException(400, 'Конфигурация пустая.')
         
-        config_price = Decimal('0')
-        for cc in config_components:
-            config_price += cc.components_id.price * cc.quantity
+        config_price = configuration.total_price
    
         order_config = OrderConfigurations.create(
             order_id=order_id,
@@ -1778,7 +2654,7 @@ async def add_configuration_to_order(
         raise HTTPException(500, f'Ошибка при добавлении конфигурации в заказ: {e}')
 
 @app.put('/order_configurations/admin/edit_order_config/', tags=['Order Configurations'])
-async def update_order_configuration(
+def update_order_configuration(
     config_id: int, 
     data: OrderConfigUpdate, 
     token: str = Header(...)
@@ -1821,7 +2697,7 @@ async def update_order_configuration(
         raise HTTPException(500, f'Ошибка при изменении конфигурации заказа: {e}')
 
 @app.delete('/order_configurations/admin/delete_order_config/', tags=['Order Configurations'])
-async def remove_configuration_from_order(config_id: int, token: str = Header(...)):
+def remove_configuration_from_order(config_id: int, token: str = Header(...)):
     """Удаление конфигурации из заказа (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
@@ -1857,41 +2733,76 @@ async def remove_configuration_from_order(config_id: int, token: str = Header(..
     except Exception as e:
         raise HTTPException(500, f'Ошибка при удалении конфигурации из заказа: {e}')
 
+@app.get('/order_configurations/admin/export/', tags=['Order Configurations'])
+def admin_export_order_configurations(export_format: str = Query('ndjson', alias='format'), token: str = Header(...)):
+    """Потоковая выгрузка всех связей заказов и конфигураций в NDJSON или CSV (только для администратора)"""
+    current_user = get_user_by_token(token, 'Администратор')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    return export_response(select_order_configurations_report(), OrderConfigurations.id,
+                           ORDER_CONFIGURATION_EXPORT_FIELDS, export_format, 'order_configurations')
+
 @app.get('/order_configurations/admin/get_all/', tags=['Order Configurations'])
-async def admin_get_all_order_configurations(token: str = Header(...)):
+def admin_get_all_order_configurations(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[int] = None,
+    token: str = Header(...)
+):
     """Получение всех связей заказов и конфигураций (только для администратора)"""
     current_user = get_user_by_token(token, 'Администратор')
     if not current_user:
         raise HTTPException(401, 'Недействительный токен.')
     
     try:
-        order_configs = OrderConfigurations.select()
+        order_configs, next_cursor = fetch_page(select_order_configurations_report(), OrderConfigurations.id, limit, after)
         
         result = []
-        for oc in order_configs:
+        for (oc_id, order_id, order_user_id, order_user_login, order_date, order_total, order_status,
+             configuration_id, configuration_name, configuration_user_id, configuration_user_login,
+             quantity, price_at_time) in order_configs:
             result.append({
-                'id': oc.id,
-                'order_id': oc.order_id.id,
-                'order_user_id': oc.order_id.user_id.id,
-                'order_user_login': oc.order_id.user_id.email,
-                'order_date': oc.order_id.order_date.isoformat(),
-                'order_total': float(oc.order_id.total_amout),
-                'order_status': oc.order_id.status_id.name,
-                'configuration_id': oc.configuration_id.id,
-                'configuration_name': oc.configuration_id.name_config,
-                'configuration_user_id': oc.configuration_id.user_id.id,
-                'configuration_user_login': oc.configuration_id.user_id.email,
-                'quantity': oc.quantity,
-                'price_at_time': float(oc.price_at_time),
-                'total': float(oc.price_at_time * oc.quantity)
+                'id': oc_id,
+                'order_id': order_id,
+                'order_user_id': order_user_id,
+                'order_user_login': order_user_login,
+                'order_date': order_date,
+                'order_total': order_total,
+                'order_status': order_status,
+                'configuration_id': configuration_id,
+                'configuration_name': configuration_name,
+                'configuration_user_id': configuration_user_id,
+                'configuration_user_login': configuration_user_login,
+                'quantity': quantity,
+                'price_at_time': price_at_time,
+                'total': price_at_time * quantity
             })
         
-        return {
-            'total_count': len(result),
-            'order_configurations': result
-        }
+        return FastJSONResponse({
+            'total_count': OrderConfigurations.select().count(),
+            'order_configurations': result,
+            'next_cursor': next_cursor
+        })
     
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
         raise HTTPException(500, f'Ошибка при получении связей заказов и конфигураций: {e}')
+
+@app.get('/service/token_cache_stats/', tags=['Service'])
+def get_token_cache_stats(token: str = Header(...)):
+    """Статистика кэша токенов (только для администратора)"""
+    current_user = get_user_by_token(token, 'Администратор')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    return token_cache.stats()
+
+@app.get('/service/db_pool_stats/', tags=['Service'])
+def get_db_pool_stats(token: str = Header(...)):
+    """Статистика пула соединений с БД (только для администратора)"""
+    current_user = get_user_by_token(token, 'Администратор')
+    if not current_user:
+        raise HTTPException(401, 'Недействительный токен.')
+    
+    return get_pool_stats()
@@ -0,0 +1,76 @@
+import argparse
+import datetime
+import json
+import time
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from json_utils import FastJSONResponse, orjson
+
+def make_rows(count: int) -> list:
+    """Строки, похожие на ответ списка заказов администратора"""
+    order_date = datetime.datetime(2024, 5, 17, 12, 30, 15)
+    return [{
+        'id': i,
+        'user_id': i % 100,
+        'user_login': f'user{i % 100}@example.com',
+        'order_date': order_date,
+        'total_amount': Decimal('123456.78') + i,
+        'status_id': 1,
+        'status_name': 'В обработке',
+        'configurations': [{
+            'configuration_id': i,
+            'configuration_name': f'Конфигурация {i}',
+            'quantity': 2,
+            'price_at_time': Decimal('61728.39')
+        }]
+    } for i in range(count)]
+
+def to_legacy_rows(rows: list) -> list:
+    """Те же строки с ручным float(Decimal) и isoformat(), как в обработчиках до перехода на FastJSONResponse"""
+    return [{
+        **row,
+        'order_date': row['order_date'].isoformat(),
+        'total_amount': float(row['total_amount']),
+        'configurations': [{
+            **config,
+            'price_at_time': float(config['price_at_time'])
+        } for config in row['configurations']]
+    } for row in rows]
+
+def measure(func, repeat: int) -> float:
+    """Медианное время выполнения функции в миллисекундах"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def run(count: int, repeat: int):
+    """Сравнение времени сериализации ответа из count строк"""
+    rows = make_rows(count)
+    content = {'items': rows, 'next_cursor': None}
+
+    results = {
+        'jsonable_encoder + JSONResponse': measure(
+            lambda: JSONResponse(jsonable_encoder({'items': to_legacy_rows(rows), 'next_cursor': None})).body, repeat),
+        'FastJSONResponse': measure(lambda: FastJSONResponse(content).body, repeat),
+    }
+
+    legacy_body = JSONResponse(jsonable_encoder({'items': to_legacy_rows(rows), 'next_cursor': None})).body
+    fast_body = FastJSONResponse(content).body
+    assert json.loads(legacy_body) == json.loads(fast_body), 'Ответы различаются'
+
+    print(f'Строк: {count}, повторов: {repeat}, orjson: {"да" if orjson else "нет"}')
+    baseline = results['jsonable_encoder + JSONResponse']
+    for name, timing in results.items():
+        print(f'{name:35} {timing:9.2f} мс  x{baseline / timing:.1f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Сравнение скорости сериализации JSON-ответов')
+    parser.add_argument('--rows', type=int, default=10000, help='число строк в ответе')
+    parser.add_argument('--repeat', type=int, default=10, help='число повторов замера')
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -0,0 +1,63 @@
+import argparse
+import statistics
+import threading
+import time
+import requests
+
+def timed_request(method, url: str, latencies: list, errors: list, **kwargs):
+    """Выполняет запрос и добавляет его время в миллисекундах в список latencies"""
+    started = time.perf_counter()
+    try:
+        response = method(url, timeout=120, **kwargs)
+        if response.status_code != 200:
+            errors.append(f'{url}: HTTP {response.status_code}')
+    except requests.exceptions.RequestException as e:
+        errors.append(f'{url}: {e}')
+    latencies.append((time.perf_counter() - started) * 1000)
+
+def login(base_url: str, email: str, password: str) -> str:
+    """Получение токена для запросов чтения"""
+    response = requests.post(f'{base_url}/users/auth/', json={'email': email, 'password': password}, timeout=120)
+    response.raise_for_status()
+    return response.json()['token']
+
+def run(base_url: str, email: str, password: str, logins: int, reads: int, read_path: str):
+    """Одновременные входы (bcrypt) и чтения каталога: задержка чтений и общая пропускная способность"""
+    token = login(base_url, email, password)
+    login_latencies, read_latencies, errors = [], [], []
+
+    threads = [threading.Thread(target=timed_request, args=(
+        requests.post, f'{base_url}/users/auth/', login_latencies, errors
+    ), kwargs={'json': {'email': email, 'password': password}}) for _ in range(logins)]
+    threads += [threading.Thread(target=timed_request, args=(
+        requests.get, f'{base_url}{read_path}', read_latencies, errors
+    ), kwargs={'headers': {'token': token}}) for _ in range(reads)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f'Входов: {logins}, чтений {read_path}: {reads}, ошибок: {len(errors)}')
+    for error in errors[:5]:
+        print(f'  {error}')
+    if login_latencies:
+        print(f'Вход:   медиана {statistics.median(login_latencies):9.0f} мс, максимум {max(login_latencies):9.0f} мс')
+    if read_latencies:
+        print(f'Чтение: медиана {statistics.median(read_latencies):9.0f} мс, максимум {max(read_latencies):9.0f} мс')
+    print(f'Всего: {elapsed:.2f} с, {len(threads) / elapsed:.1f} запросов/с')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Задержка чтений при одновременных входах; запускается против работающего API '
+                    'до и после перевода обработчиков в пул потоков')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='адрес API')
+    parser.add_argument('--email', required=True, help='email пользователя для входа')
+    parser.add_argument('--password', required=True, help='пароль пользователя')
+    parser.add_argument('--logins', type=int, default=8, help='число одновременных входов')
+    parser.add_argument('--reads', type=int, default=40, help='число одновременных чтений')
+    parser.add_argument('--read-path', default='/components/get_all/', help='адрес запроса чтения')
+    args = parser.parse_args()
+    run(args.url.rstrip('/'), args.email, args.password, args.logins, args.reads, args.read_path)
@@ -0,0 +1,20 @@
+import argparse
+from database import db_connection, init_database
+from models import run_migrations, seed_test_data
+from catalog_indexer import reindex_queued_components
+
+def bootstrap(seed: bool = True):
+    """Создание базы данных, применение миграций и заполнение тестовыми данными"""
+    init_database()
+    with db_connection.connection_context():
+        run_migrations()
+        if seed:
+            seed_test_data()
+        while reindex_queued_components():
+            pass
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Подготовка базы данных ANTech к работе')
+    parser.add_argument('--no-seed', action='store_true', help='не заполнять базу тестовыми данными')
+    args = parser.parse_args()
+    bootstrap(seed=not args.no_seed)
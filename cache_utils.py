@@ -0,0 +1,166 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Потокобезопасный LRU-кэш с временем жизни записей и счетчиками попаданий"""
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Возвращает значение по ключу или None, если записи нет или она устарела"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = item
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Сохраняет значение, вытесняя самые давно использованные записи"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        """Удаляет запись по ключу"""
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[0] if item else None
+
+    def remove_where(self, predicate) -> int:
+        """Удаляет все записи, значения которых удовлетворяют условию"""
+        with self._lock:
+            keys = [key for key, (value, _) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        """Полностью очищает кэш"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Статистика использования кэша"""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class VersionCounter:
+    """Потокобезопасный счетчик версии данных, по которому инвалидируются кэши"""
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def bump(self) -> int:
+        """Увеличивает версию и возвращает новое значение"""
+        with self._lock:
+            self.value += 1
+            return self.value
+
+
+class ReferenceCache:
+    """Кэш небольшого справочника в виде словарей название <-> ID с перезагрузкой по сроку жизни.
+    
+    Запись, добавленная в другом процессе, не найдется в кэше до перезагрузки, поэтому промах
+    перезагружает справочник сразу, но не чаще одного раза в miss_reload_interval секунд."""
+    def __init__(self, loader, ttl: float = 60, miss_reload_interval: float = 1):
+        self.ttl = ttl
+        self.miss_reload_interval = miss_reload_interval
+        self._loader = loader
+        self._rows = []
+        self._by_name = {}
+        self._by_id = {}
+        self._version = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Загружает справочник из источника; loader возвращает строки (ID, название, ...), упорядоченные по ID"""
+        rows = [tuple(row) for row in self._loader()]
+        by_id = {}
+        by_name = {}
+        for row_id, name, *_ in rows:
+            by_id[row_id] = name
+            by_name.setdefault(name, row_id)
+        # Версия зависит только от содержимого, поэтому совпадает во всех процессах с одинаковыми данными
+        version = hashlib.sha256(repr(rows).encode('utf-8')).hexdigest()[:32]
+        with self._lock:
+            self._rows = rows
+            self._by_id = by_id
+            self._by_name = by_name
+            self._version = version
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Помечает справочник устаревшим, он будет загружен заново при следующем обращении"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.ttl:
+            self.load()
+
+    def _reload_after_miss(self) -> bool:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.miss_reload_interval:
+            return False
+        self.load()
+        return True
+
+    def get_id(self, name):
+        """ID записи по названию или None"""
+        self._ensure_loaded()
+        row_id = self._by_name.get(name)
+        if row_id is None and self._reload_after_miss():
+            row_id = self._by_name.get(name)
+        return row_id
+
+    def get_name(self, row_id):
+        """Название записи по ID или None"""
+        self._ensure_loaded()
+        name = self._by_id.get(row_id)
+        if name is None and self._reload_after_miss():
+            name = self._by_id.get(row_id)
+        return name
+
+    def items(self) -> list:
+        """Все пары (ID, название), упорядоченные по ID"""
+        self._ensure_loaded()
+        return sorted(self._by_id.items())
+
+    def rows(self) -> list:
+        """Все строки справочника в том виде, в котором их вернул loader"""
+        self._ensure_loaded()
+        return self._rows
+
+    def version(self) -> str:
+        """Версия загруженного содержимого справочника"""
+        self._ensure_loaded()
+        return self._version
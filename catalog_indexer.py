@@ -0,0 +1,33 @@
+import os
+from models import ComponentsIndexQueue, index_components, index_component_attributes
+from database import db_connection
+from queue_worker import QueueWorker
+from compatibility import index_compatibility
+
+INDEX_BATCH_SIZE = int(os.getenv("INDEX_BATCH_SIZE", 500))
+INDEX_POLL_INTERVAL = int(os.getenv("INDEX_POLL_INTERVAL", 5))
+
+# Пересчет производных данных каталога для пачки компонентов из очереди
+# (совместимость считается по характеристикам, поэтому пересчитывается после них)
+REINDEX_HOOKS = [index_components, index_component_attributes, index_compatibility]
+
+def reindex_queued_components(batch_size: int = INDEX_BATCH_SIZE) -> int:
+    """Пересчитывает индексы для пачки компонентов из очереди, возвращает число обработанных записей очереди.
+
+    Пересчет идемпотентен, поэтому одну запись могут обработать два обработчика без потери данных."""
+    rows = list(ComponentsIndexQueue
+                .select(ComponentsIndexQueue.id, ComponentsIndexQueue.component_id)
+                .order_by(ComponentsIndexQueue.id)
+                .limit(batch_size)
+                .tuples())
+    if not rows:
+        return 0
+
+    component_ids = sorted({component_id for _, component_id in rows})
+    with db_connection.atomic():
+        for hook in REINDEX_HOOKS:
+            hook(component_ids)
+        ComponentsIndexQueue.delete().where(ComponentsIndexQueue.id.in_([row_id for row_id, _ in rows])).execute()
+    return len(rows)
+
+index_worker = QueueWorker(reindex_queued_components, 'catalog-indexer', INDEX_POLL_INTERVAL)
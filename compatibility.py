@@ -0,0 +1,378 @@
+import re
+from typing import Dict, List, NamedTuple, Optional
+from models import Components, ComponentsTypes, ComponentsAttributes, ComponentsIncompatibility, ConfigurationsComponents
+from peewee import JOIN
+
+# Роль компонента в проверках совместимости по названию его типа
+TYPE_ROLES = {
+    'процессор': 'cpu',
+    'материнская плата': 'motherboard',
+    'блок питания': 'psu',
+    'корпус': 'case',
+    'видеокарта': 'gpu',
+    'охлаждение процессора': 'cooler',
+    'оперативная память': 'ram',
+    'накопители': 'storage',
+    'звуковая карта': 'sound'
+}
+
+# Ключи характеристик (в нормализованном виде), по которым работают правила
+SOCKET_KEYS = ('сокет',)
+COOLER_SOCKET_KEYS = ('совместимость', 'сокет')
+RAM_TYPE_KEYS = ('тип памяти', 'тип')
+FORM_FACTOR_KEYS = ('формат', 'форм-фактор')
+CASE_BOARD_KEYS = ('поддержка плат', 'форм-фактор плат')
+POWER_DRAW_KEYS = ('tdp', 'потребляемая мощность', 'энергопотребление')
+PSU_POWER_KEYS = ('мощность',)
+COOLER_POWER_KEYS = ('рассеиваемая мощность', 'tdp')
+
+# Оценка потребления, если у компонента не указана мощность, Вт
+DEFAULT_POWER_DRAW = {
+    'cpu': 125,
+    'gpu': 200,
+    'motherboard': 50,
+    'ram': 5,
+    'storage': 10,
+    'cooler': 5,
+    'sound': 10
+}
+# Запас мощности блока питания сверх суммарного потребления
+POWER_HEADROOM = 1.2
+
+# Платы, которые помещаются в корпус данного формата
+CASE_BOARD_SUPPORT = {
+    'FULLTOWER': {'EATX', 'ATX', 'MICROATX', 'MATX', 'MINIITX'},
+    'MIDTOWER': {'ATX', 'MICROATX', 'MATX', 'MINIITX'},
+    'MINITOWER': {'MICROATX', 'MATX', 'MINIITX'},
+    'MICROATX': {'MICROATX', 'MATX', 'MINIITX'},
+    'MINIITX': {'MINIITX'}
+}
+RAM_TYPE_REGEX = re.compile(r'DDR\d')
+SINGLE_PART_ROLES = {
+    'motherboard': 'материнская плата',
+    'psu': 'блок питания',
+    'case': 'корпус'
+}
+
+class ComponentProfile(NamedTuple):
+    """Данные компонента, нужные правилам совместимости"""
+    component_id: int
+    name: str
+    role: Optional[str]
+    attributes: Dict[str, List[str]]
+    numbers: Dict[str, float]
+
+def normalize_code(value: str) -> str:
+    """Значение для сравнения: верхний регистр без пробелов и дефисов ("LGA 1700" -> "LGA1700")"""
+    return re.sub(r'[\s\-_]', '', value.upper())
+
+def attribute_codes(profile: ComponentProfile, keys: tuple) -> set:
+    """Нормализованные значения первой из найденных у компонента характеристик"""
+    for key in keys:
+        if key in profile.attributes:
+            return {normalize_code(value) for value in profile.attributes[key]}
+    return set()
+
+def attribute_number(profile: ComponentProfile, keys: tuple) -> Optional[float]:
+    """Числовое значение первой из найденных у компонента характеристик"""
+    for key in keys:
+        if key in profile.numbers:
+            return profile.numbers[key]
+    return None
+
+def ram_types(profile: ComponentProfile) -> set:
+    """Типы памяти (DDR4, DDR5...) в характеристиках компонента"""
+    return {match for code in attribute_codes(profile, RAM_TYPE_KEYS) for match in RAM_TYPE_REGEX.findall(code)}
+
+def problem(rule: str, level: str, message: str, *profiles: ComponentProfile) -> dict:
+    """Описание найденной несовместимости"""
+    return {
+        'rule': rule,
+        'level': level,
+        'message': message,
+        'component_ids': [profile.component_id for profile in profiles]
+    }
+
+def check_single_parts(parts: Dict[str, list]) -> List[dict]:
+    """В сборке не больше одной материнской платы, блока питания и корпуса"""
+    return [problem('single_part', 'error', f'В конфигурации несколько позиций типа "{title}".',
+                    *[profile for profile, _ in parts.get(role, [])])
+            for role, title in SINGLE_PART_ROLES.items()
+            if sum(quantity for _, quantity in parts.get(role, [])) > 1]
+
+def check_cpu_socket(parts: Dict[str, list]) -> List[dict]:
+    """Сокет процессора совпадает с сокетом материнской платы"""
+    problems = []
+    for cpu, _ in parts.get('cpu', []):
+        cpu_sockets = attribute_codes(cpu, SOCKET_KEYS)
+        for board, _ in parts.get('motherboard', []):
+            board_sockets = attribute_codes(board, SOCKET_KEYS)
+            if cpu_sockets and board_sockets and not cpu_sockets & board_sockets:
+                problems.append(problem('cpu_socket', 'error',
+                                        f'Сокет процессора "{cpu.name}" не подходит к материнской плате "{board.name}".',
+                                        cpu, board))
+    return problems
+
+def check_ram_type(parts: Dict[str, list]) -> List[dict]:
+    """Модули памяти одного типа, и этот тип поддерживается материнской платой"""
+    problems = []
+    modules = [(module, ram_types(module)) for module, _ in parts.get('ram', [])]
+    known = [(module, types) for module, types in modules if types]
+    if len({frozenset(types) for _, types in known}) > 1:
+        problems.append(problem('ram_type', 'error', 'В конфигурации модули памяти разных типов.',
+                                *[module for module, _ in known]))
+
+    for board, _ in parts.get('motherboard', []):
+        board_types = {match for code in attribute_codes(board, ('тип памяти',)) for match in RAM_TYPE_REGEX.findall(code)}
+        for module, types in known:
+            if board_types and not types & board_types:
+                problems.append(problem('ram_type', 'error',
+                                        f'Память "{module.name}" не поддерживается материнской платой "{board.name}".',
+                                        module, board))
+    return problems
+
+def check_cooler(parts: Dict[str, list]) -> List[dict]:
+    """Кулер поддерживает сокет процессора и рассеивает его тепловыделение"""
+    problems = []
+    for cooler, _ in parts.get('cooler', []):
+        cooler_sockets = attribute_codes(cooler, COOLER_SOCKET_KEYS)
+        cooler_power = attribute_number(cooler, COOLER_POWER_KEYS)
+        for cpu, _ in parts.get('cpu', []):
+            cpu_sockets = attribute_codes(cpu, SOCKET_KEYS)
+            if cooler_sockets and cpu_sockets and not cooler_sockets & cpu_sockets:
+                problems.append(problem('cooler_socket', 'error',
+                                        f'Охлаждение "{cooler.name}" не поддерживает сокет процессора "{cpu.name}".',
+                                        cooler, cpu))
+            cpu_power = attribute_number(cpu, POWER_DRAW_KEYS)
+            if cooler_power is not None and cpu_power is not None and cooler_power < cpu_power:
+                problems.append(problem('cooler_power', 'warning',
+                                        f'Охлаждение "{cooler.name}" рассчитано на {cooler_power:g} Вт, '
+                                        f'а процессор "{cpu.name}" выделяет {cpu_power:g} Вт.',
+                                        cooler, cpu))
+    return problems
+
+def estimate_power_draw(parts: Dict[str, list]) -> float:
+    """Суммарное потребление компонентов сборки без блоков питания, Вт"""
+    draw = 0
+    for role, items in parts.items():
+        for profile, quantity in items:
+            if role == 'psu':
+                continue
+            power = attribute_number(profile, POWER_DRAW_KEYS)
+            draw += (power if power is not None else DEFAULT_POWER_DRAW.get(role, 0)) * quantity
+    return draw
+
+def check_power(parts: Dict[str, list]) -> List[dict]:
+    """Мощности блока питания хватает на все компоненты с запасом POWER_HEADROOM"""
+    psus = [(psu, attribute_number(psu, PSU_POWER_KEYS)) for psu, _ in parts.get('psu', [])]
+    psus = [(psu, power) for psu, power in psus if power]
+    if not psus:
+        return []
+
+    draw = estimate_power_draw(parts)
+    psu, capacity = max(psus, key=lambda item: item[1])
+    if draw > capacity:
+        return [problem('power', 'error',
+                        f'Потребление конфигурации около {draw:g} Вт превышает мощность блока питания "{psu.name}" ({capacity:g} Вт).',
+                        psu)]
+    if draw * POWER_HEADROOM > capacity:
+        return [problem('power', 'warning',
+                        f'Запас мощности блока питания "{psu.name}" меньше {round((POWER_HEADROOM - 1) * 100)}% '
+                        f'(потребление около {draw:g} Вт из {capacity:g} Вт).',
+                        psu)]
+    return []
+
+def case_supported_boards(case: ComponentProfile) -> set:
+    """Форматы плат, которые помещаются в корпус: из характеристик или по формату корпуса"""
+    boards = attribute_codes(case, CASE_BOARD_KEYS)
+    if boards:
+        return boards
+    return {board for code in attribute_codes(case, FORM_FACTOR_KEYS) for board in CASE_BOARD_SUPPORT.get(code, set())}
+
+def check_form_factor(parts: Dict[str, list]) -> List[dict]:
+    """Материнская плата помещается в корпус"""
+    problems = []
+    for case, _ in parts.get('case', []):
+        supported = case_supported_boards(case)
+        for board, _ in parts.get('motherboard', []):
+            board_formats = attribute_codes(board, FORM_FACTOR_KEYS)
+            if supported and board_formats and not board_formats & supported:
+                problems.append(problem('form_factor', 'error',
+                                        f'Материнская плата "{board.name}" не помещается в корпус "{case.name}".',
+                                        board, case))
+    return problems
+
+RULES = [
+    check_single_parts,
+    check_cpu_socket,
+    check_ram_type,
+    check_cooler,
+    check_power,
+    check_form_factor
+]
+
+# Правила, результат которых зависит только от пары компонентов, - по ним строится индекс несовместимых пар
+PAIR_RULES = [
+    check_cpu_socket,
+    check_ram_type,
+    check_cooler,
+    check_form_factor
+]
+# Роли компонентов, пары которых проверяются правилами PAIR_RULES
+RELATED_ROLES = {
+    'cpu': {'motherboard', 'cooler'},
+    'motherboard': {'cpu', 'ram', 'case'},
+    'ram': {'motherboard', 'ram'},
+    'cooler': {'cpu'},
+    'case': {'motherboard'}
+}
+INDEX_BATCH_SIZE = 500
+
+def load_profiles(component_ids) -> Dict[int, ComponentProfile]:
+    """Профили компонентов с характеристиками: два запроса на любое число компонентов"""
+    component_ids = list(set(component_ids))
+    if not component_ids:
+        return {}
+
+    attributes = {component_id: ({}, {}) for component_id in component_ids}
+    rows = (ComponentsAttributes
+            .select(ComponentsAttributes.component_id, ComponentsAttributes.key,
+                    ComponentsAttributes.value, ComponentsAttributes.value_number)
+            .where(ComponentsAttributes.component_id.in_(component_ids))
+            .tuples())
+    for component_id, key, value, value_number in rows:
+        values, numbers = attributes[component_id]
+        values.setdefault(key, []).append(value)
+        if value_number is not None and key not in numbers:
+            numbers[key] = value_number
+
+    components = (Components
+                  .select(Components.id, Components.name, ComponentsTypes.name)
+                  .join(ComponentsTypes, JOIN.LEFT_OUTER)
+                  .where(Components.id.in_(component_ids))
+                  .tuples())
+    return {component_id: ComponentProfile(component_id, name,
+                                           TYPE_ROLES.get((type_name or '').lower()),
+                                           *attributes[component_id])
+            for component_id, name, type_name in components}
+
+def check_parts(items, profiles: Dict[int, ComponentProfile]) -> List[dict]:
+    """Проверка набора пар (ID компонента, количество) всеми правилами"""
+    parts = group_parts(items, profiles)
+    return [found for rule in RULES for found in rule(parts)]
+
+def configuration_items(config_ids: List[int]) -> Dict[int, List[tuple]]:
+    """Состав конфигураций одним запросом: ID конфигурации -> пары (ID компонента, количество)"""
+    items = {config_id: [] for config_id in config_ids}
+    if not config_ids:
+        return items
+
+    rows = (ConfigurationsComponents
+            .select(ConfigurationsComponents.configuration_id,
+                    ConfigurationsComponents.components_id,
+                    ConfigurationsComponents.quantity)
+            .where(ConfigurationsComponents.configuration_id.in_(config_ids))
+            .tuples())
+    for config_id, component_id, quantity in rows:
+        items[config_id].append((component_id, quantity))
+    return items
+
+def check_configurations(config_ids: List[int]) -> Dict[int, List[dict]]:
+    """Проверка совместимости набора конфигураций за три запроса к БД"""
+    items = configuration_items(config_ids)
+    profiles = load_profiles(component_id for parts in items.values() for component_id, _ in parts)
+    return {config_id: check_parts(parts, profiles) for config_id, parts in items.items()}
+
+def check_configuration(config_id: int, extra_items: Optional[List[tuple]] = None) -> List[dict]:
+    """Проверка совместимости конфигурации, при необходимости вместе с добавляемыми компонентами"""
+    parts = configuration_items([config_id])[config_id] + list(extra_items or [])
+    return check_parts(parts, load_profiles(component_id for component_id, _ in parts))
+
+def group_parts(items, profiles: Dict[int, ComponentProfile]) -> Dict[str, list]:
+    """Группировка пар (ID компонента, количество) по ролям"""
+    parts = {}
+    for component_id, quantity in items:
+        profile = profiles.get(component_id)
+        if profile and profile.role:
+            parts.setdefault(profile.role, []).append((profile, quantity))
+    return parts
+
+def pair_incompatible(first: ComponentProfile, second: ComponentProfile) -> bool:
+    """Есть ли ошибка совместимости между двумя компонентами"""
+    parts = group_parts([(first.component_id, 1), (second.component_id, 1)],
+                        {first.component_id: first, second.component_id: second})
+    return any(found['level'] == 'error' for rule in PAIR_RULES for found in rule(parts))
+
+def type_ids_for_roles(roles: set) -> List[int]:
+    """ID типов компонентов с указанными ролями"""
+    return [type_id for type_id, name in ComponentsTypes.select(ComponentsTypes.id, ComponentsTypes.name).tuples()
+            if TYPE_ROLES.get(name.lower()) in roles]
+
+def index_compatibility(component_ids: List[int]):
+    """Пересчет несовместимых пар для указанных компонентов со всеми компонентами связанных ролей"""
+    component_ids = list(set(component_ids))
+    if not component_ids:
+        return
+
+    changed = [profile for profile in load_profiles(component_ids).values() if profile.role in RELATED_ROLES]
+    roles = {role for profile in changed for role in RELATED_ROLES[profile.role]}
+    candidate_ids = [component_id for component_id, in Components
+                     .select(Components.id)
+                     .where(Components.type_id.in_(type_ids_for_roles(roles)))
+                     .tuples()] if roles else []
+    candidates = load_profiles(candidate_ids)
+
+    pairs = set()
+    for profile in changed:
+        for other in candidates.values():
+            if other.component_id != profile.component_id and other.role in RELATED_ROLES[profile.role] \
+                    and pair_incompatible(profile, other):
+                pairs.add((profile.component_id, other.component_id))
+                pairs.add((other.component_id, profile.component_id))
+
+    ComponentsIncompatibility.delete().where(
+        ComponentsIncompatibility.component_id.in_(component_ids) |
+        ComponentsIncompatibility.other_id.in_(component_ids)
+    ).execute()
+    rows = [{'component_id': component_id, 'other_id': other_id} for component_id, other_id in sorted(pairs)]
+    for start in range(0, len(rows), INDEX_BATCH_SIZE):
+        ComponentsIncompatibility.insert_many(rows[start:start + INDEX_BATCH_SIZE]).execute()
+
+def select_incompatible_ids(component_ids: List[int]):
+    """Подзапрос ID компонентов, несовместимых хотя бы с одним из указанных"""
+    return (ComponentsIncompatibility
+            .select(ComponentsIncompatibility.other_id)
+            .where(ComponentsIncompatibility.component_id.in_(component_ids)))
+
+def filled_single_part_type_ids(component_ids: List[int]) -> List[int]:
+    """ID типов, компонент которых в сборке может быть только один и уже есть среди указанных (правило check_single_parts)"""
+    type_names = (ComponentsTypes
+                  .select(ComponentsTypes.name)
+                  .join(Components)
+                  .where(Components.id.in_(component_ids))
+                  .distinct()
+                  .tuples())
+    roles = {TYPE_ROLES.get(name.lower()) for name, in type_names} & set(SINGLE_PART_ROLES)
+    return type_ids_for_roles(roles) if roles else []
+
+def select_underpowered_psu_ids(items):
+    """Подзапрос ID блоков питания, мощности которых не хватает на компоненты из пар (ID, количество)"""
+    draw = estimate_power_draw(group_parts(items, load_profiles(component_id for component_id, _ in items)))
+    if not draw:
+        return None
+
+    psu_ids = Components.select(Components.id).where(Components.type_id.in_(type_ids_for_roles({'psu'})))
+    return (ComponentsAttributes
+            .select(ComponentsAttributes.component_id)
+            .where(
+                ComponentsAttributes.key.in_(PSU_POWER_KEYS) &
+                (ComponentsAttributes.value_number < draw) &
+                ComponentsAttributes.component_id.in_(psu_ids)
+            ))
+
+def compatibility_report(problems: List[dict]) -> dict:
+    """Итог проверки для ответа API"""
+    return {
+        'compatible': not any(found['level'] == 'error' for found in problems),
+        'problems': problems
+    }
@@ -1,12 +1,19 @@
+import os
 import pymysql
-from peewee import MySQLDatabase
+from playhouse.pool import PooledMySQLDatabase
 from pymysql import MySQLError
+from dotenv import load_dotenv
+
+load_dotenv()
 
 DB_HOST = 'localhost'
 DB_PORT = 3306
 DB_USERNAME = 'root'
 DB_PASSWORD = 'root'
 DB_NAME = 'pc'
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 20))
+DB_STALE_TIMEOUT = int(os.getenv('DB_STALE_TIMEOUT', 300))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 10))
 
 def init_database():
     try:
@@ -26,12 +33,22 @@ def init_database():
         if 'connection' in locals() and connection:
             connection.close()
 
-init_database()
-
-db_connection = MySQLDatabase(
+db_connection = PooledMySQLDatabase(
     DB_NAME,
     user=DB_USERNAME,
     password=DB_PASSWORD,
     host=DB_HOST,
-    port=DB_PORT
-)
\ No newline at end of file
+    port=DB_PORT,
+    max_connections=DB_MAX_CONNECTIONS,
+    stale_timeout=DB_STALE_TIMEOUT,
+    timeout=DB_POOL_TIMEOUT
+)
+
+def get_pool_stats():
+    """Статистика использования пула соединений с БД"""
+    return {
+        'max_connections': DB_MAX_CONNECTIONS,
+        'stale_timeout': DB_STALE_TIMEOUT,
+        'in_use': len(db_connection._in_use),
+        'idle': len(db_connection._connections)
+    }
@@ -20,6 +20,77 @@ import datetime
 # os.environ['TCL_LIBRARY'] = r'C:\Users\User\AppData\Local\Programs\Python\Python311\tcl\tcl8.6'
 # os.environ['TK_LIBRARY'] = r'C:\Users\User\AppData\Local\Programs\Python\Python311\tcl\tk8.6'
 
+# Общая HTTP-сессия: переиспользует соединения с сервером и запрашивает сжатые ответы
+http_session = requests.Session()
+http_session.headers['Accept-Encoding'] = 'gzip'
+
+# Локальный кэш ответов с ETag: (url, параметры) -> (ETag, данные)
+http_cache = {}
+
+def cached_get(url, headers, params=None):
+    """Выполняет GET запрос с If-None-Match и возвращает ответ и данные, при 304 - из локального кэша"""
+    cache_key = (url, tuple(sorted((params or {}).items())))
+    cached = http_cache.get(cache_key)
+    request_headers = dict(headers)
+    if cached:
+        request_headers['If-None-Match'] = cached[0]
+    
+    response = http_session.get(url, headers=request_headers, params=params)
+    if response.status_code == 304 and cached:
+        return response, cached[1]
+    if response.status_code != 200:
+        return response, None
+    
+    data = response.json()
+    etag = response.headers.get('ETag')
+    if etag:
+        http_cache[cache_key] = (etag, data)
+    return response, data
+
+def get_all_pages(url, headers, params=None):
+    """Загружает все страницы списка, переходя по next_cursor, и возвращает последний ответ и элементы"""
+    items = []
+    page_params = dict(params or {})
+    while True:
+        response, page = cached_get(url, headers, page_params)
+        if page is None:
+            return response, None
+        
+        items.extend(page['items'])
+        if page['next_cursor'] is None:
+            return response, items
+        page_params['after'] = page['next_cursor']
+
+# Число компонентов на одной странице каталога; следующие страницы подгружаются кнопкой "Загрузить еще"
+CATALOG_PAGE_SIZE = 100
+
+def build_component_search_params(selected_type, min_price, max_price, search_term, sort_option):
+    """Параметры запроса /components/search/ по значениям фильтров каталога"""
+    params = {}
+    if selected_type and selected_type != "Все типы":
+        params['type_name'] = selected_type
+    for name, value in (('min_price', min_price), ('max_price', max_price)):
+        if value:
+            try:
+                params[name] = float(value)
+            except ValueError:
+                pass
+    if search_term:
+        params['q'] = search_term
+    if sort_option == "Цена по возрастанию":
+        params['sort'] = 'price_asc'
+    elif sort_option == "Цена по убыванию":
+        params['sort'] = 'price_desc'
+    return params
+
+def count_found_components(facets) -> int:
+    """Число компонентов, подходящих под фильтры, по ответу /components/facets/"""
+    return sum(item['count'] for item in facets['types'])
+
+def facets_params(search_params) -> dict:
+    """Параметры запроса /components/facets/ с теми же фильтрами, что и у поиска, без сортировки и пагинации"""
+    return {name: value for name, value in search_params.items() if name not in ('sort', 'limit', 'after')}
+
 class ModernStyle:
     """Стиль оформления приложения с цветовой схемой и параметрами"""
     def __init__(self):
@@ -173,7 +244,7 @@ class ModernAuthApp:
             else:
                 auth_data = {'email': login, 'password': password}
             
-            response = requests.post(
+            response = http_session.post(
                 f'{self.base_url}/users/auth/',
                 json=auth_data
             )
@@ -287,7 +358,7 @@ class ForgotPasswordWindow:
             return
             
         try:
-            response = requests.post(
+            response = http_session.post(
                 f'{self.base_url}/users/change_password/',
                 params={'email': email}
             )
@@ -312,7 +383,7 @@ class ForgotPasswordWindow:
             return
             
         try:
-            response = requests.post(
+            response = http_session.post(
                 f'{self.base_url}/users/confirm_change_password/',
                 params={
                     'email': self.email,
@@ -411,7 +482,7 @@ class CodeLoginWindow:
             return
             
         try:
-            response = requests.post(
+            response = http_session.post(
                 f'{self.base_url}/users/request_login_code/',
                 params={'email': email}
             )
@@ -435,7 +506,7 @@ class CodeLoginWindow:
             return
             
         try:
-            response = requests.post(
+            response = http_session.post(
                 f'{self.base_url}/users/confirm_login_code/',
                 params={'email': self.email, 'code': code}
             )
@@ -533,7 +604,7 @@ class RegistrationWindow:
             return
             
         try:
-            response = requests.post(
+            response = http_session.post(
                 f'{self.base_url}/users/register/',
                 params={
                     'email': email,
@@ -681,7 +752,7 @@ class MainApp:
         """Загружает данные пользователя"""
         try:
             headers = {'token': self.token}
-            response = requests.get(f'{self.base_url}/users/me/', headers=headers)
+            response = http_session.get(f'{self.base_url}/users/me/', headers=headers)
             if response.status_code == 200:
                 self.user_data = response.json()
             else:
@@ -693,6 +764,10 @@ class MainApp:
     
     def logout(self):
         """Выполняет выход из системы"""
+        try:
+            http_session.post(f'{self.base_url}/users/logout/', headers={'token': self.token})
+        except requests.exceptions.RequestException:
+            pass
         for widget in self.root.winfo_children():
             widget.destroy()
         ModernAuthApp(self.root)
@@ -758,7 +833,11 @@ class MainApp:
         ttk.Button(button_frame, text='Сбросить', 
                   command=self.reset_filters, style='Secondary.TButton').pack(side='left', padx=(0, 5))
         ttk.Button(button_frame, text='Экспорт',
-                   command=self.export_catalog, style='Primary.TButton').pack(side='left')
+                   command=self.export_catalog, style='Primary.TButton').pack(side='left', padx=(0, 5))
+        self.load_more_button = ttk.Button(button_frame, text='Загрузить еще',
+                                           command=self.load_catalog_page, style='Secondary.TButton',
+                                           state='disabled')
+        self.load_more_button.pack(side='left')
         
         search_frame = ttk.Frame(self.tab_catalog, style='Surface.TFrame')
         search_frame.pack(fill='x', pady=(0, 20))
@@ -815,100 +894,80 @@ class MainApp:
                                                   font=('Arial', 10), wrap=tk.WORD)
         self.spec_text.pack(fill='x')
         
-        self.all_components = []
         self.filtered_components = []
         self.available_types = set()
+        self.catalog_params = {}
+        self.catalog_next_cursor = None
         
         self.load_components()
 
     def load_components(self):
-        """Загружает список компонентов"""
+        """Загружает список типов и первую страницу каталога с текущими фильтрами"""
         try:
-            headers = {'token': self.token}
-            response = requests.get(f'{self.base_url}/components/get_all/', headers=headers)
-            
-            if response.status_code == 200: 
-                for item in self.tree.get_children():
-                    self.tree.delete(item)
-                
-                components = response.json()
-                
-                self.all_components = components
-                self.filtered_components = components.copy()
-
-                self.available_types = set()
-                for component in components:
-                    if component.get('type_name'):
-                        self.available_types.add(component['type_name'])
-
-                self.type_combo['values'] = ["Все типы"] + sorted(list(self.available_types))
-                self.type_combo.set("Все типы")
-
-                self.display_filtered_components()
-            else:
-                messagebox.showerror('Ошибка!', 'Не удалось загрузить данные о компонентах')
+            self.load_type_facets()
         except requests.exceptions.RequestException as e:
             messagebox.showerror('Ошибка!', f'Не удалось получить данные от сервера: {e}')
+            return
+        self.apply_filters()
     
-    def apply_filters(self):
-        """Применяет фильтры к каталогу"""
-        if not hasattr(self, 'all_components') or not self.all_components:
+    def load_type_facets(self):
+        """Заполняет список типов по фасетам каталога с сервера"""
+        response, facets = cached_get(f'{self.base_url}/components/facets/', {'token': self.token})
+        if facets is None:
             return
         
-        filtered = self.all_components.copy()
+        self.available_types = {item['name'] for item in facets['types'] if item['name']}
+        self.type_combo['values'] = ["Все типы"] + sorted(self.available_types)
+        if self.type_filter.get() not in self.type_combo['values']:
+            self.type_combo.set("Все типы")
 
-        selected_type = self.type_filter.get()
-        if selected_type and selected_type != "Все типы":
-            filtered = [comp for comp in filtered if comp.get('type_name') == selected_type]
-
-        min_price = self.min_price_filter.get()
-        if min_price:
-            try:
-                min_price_val = float(min_price)
-                filtered = [comp for comp in filtered if comp.get('price', 0) >= min_price_val]
-            except ValueError:
-                pass 
-
-        max_price = self.max_price_filter.get()
-        if max_price:
-            try:
-                max_price_val = float(max_price)
-                filtered = [comp for comp in filtered if comp.get('price', 0) <= max_price_val]
-            except ValueError:
-                pass
+    def apply_filters(self):
+        """Применяет фильтры к каталогу: отбор и сортировка выполняются сервером, показывается первая страница"""
+        self.catalog_params = build_component_search_params(
+            self.type_filter.get(),
+            self.min_price_filter.get(),
+            self.max_price_filter.get(),
+            self.search_var.get().strip(),
+            self.sort_filter.get()
+        )
+        self.catalog_next_cursor = None
+        self.filtered_components = []
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self.load_catalog_page()
 
-        search_term = self.search_var.get().strip().lower()
-        if search_term:
-            filtered = [comp for comp in filtered if (
-                search_term in comp['name'].lower() or 
-                search_term in comp['type_name'].lower() or 
-                search_term in comp['manufacture_name'].lower()
-            )]
-        
-        sort_option = self.sort_filter.get()
-        if sort_option == "Цена по возрастанию":
-            filtered.sort(key=lambda x: x.get('price', 0))
-        elif sort_option == "Цена по убыванию":
-            filtered.sort(key=lambda x: x.get('price', 0), reverse=True)
+    def load_catalog_page(self):
+        """Загружает следующую страницу каталога с сервера и добавляет ее в таблицу"""
+        params = {**self.catalog_params, 'limit': CATALOG_PAGE_SIZE}
+        if self.catalog_next_cursor is not None:
+            params['after'] = self.catalog_next_cursor
+        try:
+            response = http_session.get(f'{self.base_url}/components/search/', headers={'token': self.token},
+                                        params=params)
+            if response.status_code != 200:
+                messagebox.showerror('Ошибка!', 'Не удалось загрузить данные о компонентах')
+                return
+        except requests.exceptions.RequestException as e:
+            messagebox.showerror('Ошибка!', f'Не удалось получить данные от сервера: {e}')
+            return
         
-        self.filtered_components = filtered
-        self.display_filtered_components()
+        page = response.json()
+        self.filtered_components.extend(page['items'])
+        self.catalog_next_cursor = page['next_cursor']
+        self.load_more_button.config(state='normal' if self.catalog_next_cursor is not None else 'disabled')
+        self.insert_catalog_rows(page['items'])
 
     def reset_filters(self):
         """Сбрасывает фильтры каталога"""
-        self.type_filter.set('')
+        self.type_filter.set('Все типы')
         self.min_price_filter.set('')
         self.max_price_filter.set('')
         self.search_var.set('')
-        self.filtered_components = self.all_components.copy()
-        self.display_filtered_components()
+        self.apply_filters()
 
-    def display_filtered_components(self):
-        """Отображает отфильтрованные компоненты"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        for component in self.filtered_components:
+    def insert_catalog_rows(self, components):
+        """Добавляет компоненты в конец таблицы каталога"""
+        for component in components:
             self.tree.insert('', 'end', values=(
                 component['id'],
                 component['name'],
@@ -943,7 +1002,12 @@ class MainApp:
     def perform_export(self, file_path):
         """Выполняет экспорт отфильтрованного каталога компонентов в xlsx формат"""     
         try:
-            df = pd.DataFrame(self.filtered_components)
+            response, components = get_all_pages(f'{self.base_url}/components/search/', {'token': self.token},
+                                                 {**self.catalog_params, 'limit': 1000})
+            if components is None:
+                messagebox.showerror('Ошибка!', 'Не удалось загрузить каталог компонентов для экспорта')
+                return
+            df = pd.DataFrame(components)
             column_mapping = {
                 "id": "ID",
                 "name": "Название",
@@ -985,7 +1049,14 @@ class MainApp:
         self.apply_filters()
         
         if self.search_var.get().strip():
-            messagebox.showinfo('Поиск', f'Найдено компонентов: {len(self.filtered_components)}')
+            try:
+                response, facets = cached_get(f'{self.base_url}/components/facets/', {'token': self.token},
+                                              facets_params(self.catalog_params))
+            except requests.exceptions.RequestException as e:
+                messagebox.showerror('Ошибка!', f'Не удалось получить данные от сервера: {e}')
+                return
+            if facets is not None:
+                messagebox.showinfo('Поиск', f'Найдено компонентов: {count_found_components(facets)}')
 
 
     def clear_search(self):
@@ -1136,13 +1207,12 @@ class MainApp:
         """Загружает список конфигураций"""
         try:
             headers = {'token': self.token}
-            response = requests.get(f'{self.base_url}/configurations/get_all/', headers=headers)
+            response, configurations = get_all_pages(f'{self.base_url}/configurations/get_all/', headers)
             
-            if response.status_code == 200:
+            if configurations is not None:
                 for item in self.config_tree.get_children():
                     self.config_tree.delete(item)
                 
-                configurations = response.json()
                 self.configurations_data = {}
                 
                 for config in configurations:
@@ -1183,7 +1253,7 @@ class MainApp:
         """Загружает компоненты выбранной конфигурации"""
         try:
             headers = {'token': self.token}
-            response = requests.get(f'{self.base_url}/configurations/{config_id}/components/', headers=headers)
+            response = http_session.get(f'{self.base_url}/configurations/{config_id}/components/', headers=headers)
             
             if response.status_code == 200:
                 for item in self.config_components_tree.get_children():
@@ -1231,7 +1301,7 @@ class MainApp:
         
         try:
             headers = {'token': self.token}
-            response = requests.get(
+            response = http_session.get(
                 f'{self.base_url}/configurations/{self.current_config_id}/components/',
                 headers=headers
             )
@@ -1352,7 +1422,7 @@ class MainApp:
             
             try:
                 headers = {'token': self.token}
-                response = requests.post(
+                response = http_session.post(
                     f'{self.base_url}/configurations/create/',
                     headers=headers,
                     json={'name_config': name, 'description': description}
@@ -1379,10 +1449,6 @@ class MainApp:
         if not hasattr(self, 'current_config_id') or not self.current_config_id:
             messagebox.showwarning('Внимание!', 'Выберите конфигурацию для добавления компонентов')
             return
-
-        if not hasattr(self, 'all_components') or not self.all_components:
-            messagebox.showwarning('Внимание!', 'Сначала загрузите каталог компонентов')
-            return
         
         dialog = tk.Toplevel(self.root)
         dialog.title('Добавление компонента')
@@ -1403,8 +1469,7 @@ class MainApp:
         type_var = tk.StringVar()
         type_combo = ttk.Combobox(filter_frame, textvariable=type_var, style='Modern.TCombobox')
 
-        types = list(set(comp['type_name'] for comp in self.all_components if comp['type_name']))
-        type_combo['values'] = ['Все'] + types
+        type_combo['values'] = ['Все'] + sorted(self.available_types)
         type_combo.set('Все')
         type_combo.pack(side='left', padx=5)
 
@@ -1437,21 +1502,49 @@ class MainApp:
         quantity_spin = ttk.Spinbox(quantity_frame, from_=1, to=100, textvariable=quantity_var, width=10, style='Modern.TEntry')
         quantity_spin.pack(side='left', padx=5)
         
+        next_cursor = None
+        
+        def load_components_page():
+            """Загрузка следующей страницы совместимых компонентов"""
+            nonlocal next_cursor
+            params = {'fields': 'name,type_name,manufacture_name,price,stock_quantity', 'limit': CATALOG_PAGE_SIZE}
+            selected_type = type_var.get()
+            if selected_type and selected_type != 'Все':
+                params['type'] = selected_type
+            if next_cursor is not None:
+                params['after'] = next_cursor
+            try:
+                response = http_session.get(
+                    f'{self.base_url}/configurations/{self.current_config_id}/compatible_components/',
+                    headers={'token': self.token},
+                    params=params
+                )
+                if response.status_code != 200:
+                    messagebox.showerror('Ошибка!', 'Не удалось получить совместимые компоненты')
+                    return
+            except requests.exceptions.RequestException as e:
+                messagebox.showerror('Ошибка!', f'Не удалось получить данные от сервера: {e}')
+                return
+            
+            page = response.json()
+            next_cursor = page['next_cursor']
+            load_more_button.config(state='normal' if next_cursor is not None else 'disabled')
+            for component in page['items']:
+                comp_tree.insert('', 'end', values=(
+                    component['name'],
+                    component['type_name'] or '-',
+                    component['manufacture_name'] or '-',
+                    f"{component['price']:.2f} руб.",
+                    component['stock_quantity']
+                ), tags=(component['name'],))
+        
         def filter_components():
-            """Фильтрация компонентов по типу"""
+            """Фильтрация компонентов по типу и совместимости с уже добавленными в конфигурацию"""
+            nonlocal next_cursor
             for item in comp_tree.get_children():
                 comp_tree.delete(item)
-            
-            selected_type = type_var.get()
-            for component in self.all_components:
-                if selected_type == 'Все' or component['type_name'] == selected_type:
-                    comp_tree.insert('', 'end', values=(
-                        component['name'],
-                        component['type_name'] or '-',
-                        component['manufacture_name'] or '-',
-                        f"{component['price']:.2f} руб.",
-                        component['stock_quantity']
-                    ), tags=(component['name'],))
+            next_cursor = None
+            load_components_page()
         
         def add_selected_component():
             """Добавление компонента в конфигурацию"""
@@ -1466,14 +1559,19 @@ class MainApp:
             
             try:
                 headers = {'token': self.token}
-                response = requests.post(
+                response = http_session.post(
                     f'{self.base_url}/configurations/{self.current_config_id}/components/',
                     headers=headers,
                     json={'component_name': component_name, 'quantity': quantity}
                 )
                 
                 if response.status_code == 200:
-                    messagebox.showinfo('Успех!', 'Компонент добавлен')
+                    problems = response.json().get('compatibility', {}).get('problems', [])
+                    if problems:
+                        messagebox.showwarning('Совместимость', 'Компонент добавлен, но есть замечания по совместимости:\n\n' +
+                                               '\n'.join(f"• {found['message']}" for found in problems))
+                    else:
+                        messagebox.showinfo('Успех!', 'Компонент добавлен')
                     dialog.destroy()
                     self.load_configuration_components(self.current_config_id)
                 else:
@@ -1482,16 +1580,19 @@ class MainApp:
             except requests.exceptions.RequestException as e:
                 messagebox.showerror('Ошибка!', f'Ошибка соединения: {e}')
     
-        filter_components()
-
         type_combo.bind('<<ComboboxSelected>>', lambda e: filter_components())
         
         button_frame = ttk.Frame(content_frame, style='Surface.TFrame')
         button_frame.pack(pady=10)
         
+        load_more_button = ttk.Button(button_frame, text='Загрузить еще', command=load_components_page,
+                                      style='Secondary.TButton', state='disabled')
+        load_more_button.pack(side='left', padx=10)
         ttk.Button(button_frame, text='Добавить', command=add_selected_component, 
                 style='Primary.TButton').pack(side='left', padx=10)
         ttk.Button(button_frame, text='Отмена', command=dialog.destroy, style='Secondary.TButton').pack(side='left', padx=10)
+        
+        filter_components()
 
     def remove_component_from_config(self):
         """Удаляет компонент из конфигурации"""
@@ -1505,7 +1606,7 @@ class MainApp:
         
         try:
             headers = {'token': self.token}
-            response = requests.delete(
+            response = http_session.delete(
                 f'{self.base_url}/configurations/{self.current_config_id}/components/{self.selected_component_id}/',
                 headers=headers
             )
@@ -1546,7 +1647,7 @@ class MainApp:
             
             try:
                 headers = {'token': self.token}
-                response = requests.post(
+                response = http_session.post(
                     f'{self.base_url}/orders/create_order/',
                     headers=headers,
                     json={'configuration_id': self.current_config_id, 'quantity': quantity}
@@ -1583,7 +1684,7 @@ class MainApp:
         if messagebox.askyesno('Подтверждение', f'Удалить конфигурацию "{config_name}"?'):
             try:
                 headers = {'token': self.token}
-                response = requests.delete(
+                response = http_session.delete(
                     f'{self.base_url}/configurations/delete_by_id/',
                     headers=headers,
                     params={'config_id': self.current_config_id}
@@ -2150,7 +2251,7 @@ class MainApp:
             try:
                 headers = {'token': self.token}
  
-                update_response = requests.put(
+                update_response = http_session.put(
                     f'{self.base_url}/orders/user/update_order_status/',
                     headers=headers,
                     params={
@@ -2224,7 +2325,7 @@ class MainApp:
         if messagebox.askyesno('Подтверждение', f'Вы уверены, что хотите отменить заказ #{order_id}?'):
             try:
                 headers = {'token': self.token}
-                response = requests.delete(
+                response = http_session.delete(
                     f'{self.base_url}/orders/cancel_order/',
                     headers=headers,
                     params={'order_id': order_id}
@@ -2246,13 +2347,12 @@ class MainApp:
         """Загружает список заказов"""
         try:
             headers = {'token': self.token}
-            response = requests.get(f'{self.base_url}/orders/get_user_orders/', headers=headers)
+            response, orders = get_all_pages(f'{self.base_url}/orders/get_user_orders/', headers)
             
-            if response.status_code == 200:
+            if orders is not None:
                 for item in self.orders_tree.get_children():
                     self.orders_tree.delete(item)
                 
-                orders = response.json()
                 self.orders_data = {}
                 
                 for order in orders:
@@ -2394,7 +2494,7 @@ class MainApp:
                     messagebox.showerror('Ошибка!', 'Токен авторизации не найден')
                     return
                 
-                response = requests.put(
+                response = http_session.put(
                     f'{self.base_url}/users/edit_address/',
                     params={'new_address': new_address},
                     headers={'token': self.token}
@@ -2466,7 +2566,7 @@ class MainApp:
                     return
                 
                 try:
-                    response = requests.post(
+                    response = http_session.post(
                         f'{self.base_url}/users/confirm_change_password/',
                         params={
                             'email': user_email,
@@ -2489,7 +2589,7 @@ class MainApp:
         
         def send_code():
             try:
-                response = requests.post(
+                response = http_session.post(
                     f'{self.base_url}/users/change_password/',
                     params={'email': user_email}
                 )
@@ -2630,6 +2730,10 @@ class AdminApp:
     
     def logout(self):
         """Выполняет выход из системы"""
+        try:
+            http_session.post(f'{self.base_url}/users/logout/', headers={'token': self.token})
+        except requests.exceptions.RequestException:
+            pass
         for widget in self.root.winfo_children():
             widget.destroy()
         ModernAuthApp(self.root)
@@ -2641,13 +2745,15 @@ class AdminApp:
             url = f'{self.base_url}{endpoint}'
             
             if method == 'GET':
-                response = requests.get(url, headers=headers, params=params)
+                response, data = cached_get(url, headers, params)
+                if data is not None:
+                    return data
             elif method == 'POST':
-                response = requests.post(url, headers=headers, json=json_data, params=params)
+                response = http_session.post(url, headers=headers, json=json_data, params=params)
             elif method == 'PUT':
-                response = requests.put(url, headers=headers, json=json_data, params=params)
+                response = http_session.put(url, headers=headers, json=json_data, params=params)
             elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, params=params)
+                response = http_session.delete(url, headers=headers, params=params)
             
             if response.status_code == 200:
                 return response.json()
@@ -2659,6 +2765,20 @@ class AdminApp:
             messagebox.showerror('Ошибка!', f'Ошибка соединения: {e}')
             return None
     
+    def make_paged_api_request(self, endpoint, params=None):
+        """Выполняет GET запрос к списку с пагинацией и собирает все страницы"""
+        items = []
+        page_params = dict(params or {})
+        while True:
+            data = self.make_api_request(endpoint, params=page_params)
+            if data is None:
+                return None
+            
+            items.extend(data['items'])
+            if data['next_cursor'] is None:
+                return items
+            page_params['after'] = data['next_cursor']
+    
     def init_users_tab(self):
         """Инициализирует вкладку пользователей"""
         main_frame = ttk.Frame(self.tab_users, style='Surface.TFrame')
@@ -2728,7 +2848,7 @@ class AdminApp:
         
         try:
             headers = {'token': self.token}
-            response = requests.post(
+            response = http_session.post(
                 f'{self.base_url}/users/get_user_by_email_or_phone/',
                 headers=headers,
                 json=search_data
@@ -2765,7 +2885,7 @@ class AdminApp:
     
     def load_users(self):
         """Загружает список пользователей"""
-        data = self.make_api_request('/users/get_all/')
+        data = self.make_paged_api_request('/users/get_all/')
         if data:
             for item in self.users_tree.get_children():
                 self.users_tree.delete(item)
@@ -2993,6 +3113,10 @@ class AdminApp:
                   command=self.delete_component, style='Secondary.TButton').pack(side='left', padx=5)
         ttk.Button(button_frame, text='Экспорт', 
                   command=self.export_components, style='Primary.TButton').pack(side='left', padx=5)
+        self.admin_load_more_button = ttk.Button(button_frame, text='Загрузить еще',
+                                                 command=self.admin_load_components_page, style='Secondary.TButton',
+                                                 state='disabled')
+        self.admin_load_more_button.pack(side='left', padx=5)
 
         columns = ('id', 'name', 'type', 'manufacture', 'price', 'stock')
         self.components_tree = ttk.Treeview(main_frame, columns=columns, show='headings', height=20)
@@ -3019,31 +3143,22 @@ class AdminApp:
 
         admin_search_entry.bind('<Return>', lambda event: self.admin_search_components())
 
-        self.admin_all_components = []
-        self.admin_filtered_components = []
         self.admin_available_types = set()
+        self.admin_catalog_params = {}
+        self.admin_next_cursor = None
         
         self.load_components()
 
     def load_components(self):
-        """Загружает список компонентов"""
-        data = self.make_api_request('/components/get_all/')
-        if data:
-            for item in self.components_tree.get_children():
-                self.components_tree.delete(item)
-            
-            self.admin_all_components = data
-            self.admin_filtered_components = data.copy()
-
-            self.admin_available_types = set()
-            for component in data:
-                if component.get('type_name'):
-                    self.admin_available_types.add(component['type_name'])
-
-            self.admin_type_combo['values'] = ["Все типы"] + sorted(list(self.admin_available_types))
-            self.admin_type_combo.set("Все типы")
-
-            self.admin_display_filtered_components()
+        """Загружает список типов и первую страницу компонентов с текущими фильтрами"""
+        facets = self.make_api_request('/components/facets/')
+        if facets:
+            self.admin_available_types = {item['name'] for item in facets['types'] if item['name']}
+            self.admin_type_combo['values'] = ["Все типы"] + sorted(self.admin_available_types)
+            if self.admin_type_filter.get() not in self.admin_type_combo['values']:
+                self.admin_type_combo.set("Все типы")
+        
+        self.admin_apply_filters()
     
     def export_components(self):
         """Экспорт компонентов в Excel"""
@@ -3069,7 +3184,10 @@ class AdminApp:
     def perform_components_export(self, file_path):
         """Выполняет экспорт компонентов в xlsx формат"""
         try:
-            df = pd.DataFrame(self.admin_filtered_components)
+            components = self.make_paged_api_request('/components/search/', {**self.admin_catalog_params, 'limit': 1000})
+            if components is None:
+                return
+            df = pd.DataFrame(components)
             column_mapping = {
                 "id": "ID",
                 "name": "Название",
@@ -3366,64 +3484,31 @@ class AdminApp:
             messagebox.showerror('Ошибка!', f'Ошибка при экспорте в PDF: {e}')
     
     def admin_apply_filters(self):
-        """Применяет фильтры к списку компонентов"""
-        if not hasattr(self, 'admin_all_components') or not self.admin_all_components:
-            return
-        
-        filtered = self.admin_all_components.copy()
-
-        selected_type = self.admin_type_filter.get()
-        if selected_type and selected_type != "Все типы":
-            filtered = [comp for comp in filtered if comp.get('type_name') == selected_type]
-
-        min_price = self.admin_min_price_filter.get()
-        if min_price:
-            try:
-                min_price_val = float(min_price)
-                filtered = [comp for comp in filtered if comp.get('price', 0) >= min_price_val]
-            except ValueError:
-                pass
-
-        max_price = self.admin_max_price_filter.get()
-        if max_price:
-            try:
-                max_price_val = float(max_price)
-                filtered = [comp for comp in filtered if comp.get('price', 0) <= max_price_val]
-            except ValueError:
-                pass
-
-        search_term = self.admin_search_var.get().strip().lower()
-        if search_term:
-            filtered = [comp for comp in filtered if (
-                search_term in comp['name'].lower() or 
-                search_term in comp['type_name'].lower() or 
-                search_term in comp['manufacture_name'].lower()
-            )]
-        
-        sort_option = self.admin_sort_filter.get()
-        if sort_option == "Цена по возрастанию":
-            filtered.sort(key=lambda x: x.get('price', 0))
-        elif sort_option == "Цена по убыванию":
-            filtered.sort(key=lambda x: x.get('price', 0), reverse=True)
-        
-        self.admin_filtered_components = filtered
-        self.admin_display_filtered_components()
-
-    def admin_reset_filters(self):
-        """Сбрасывает фильтры компонентов"""
-        self.admin_type_filter.set('Все типы')
-        self.admin_min_price_filter.set('')
-        self.admin_max_price_filter.set('')
-        self.admin_search_var.set('')
-        self.admin_filtered_components = self.admin_all_components.copy()
-        self.admin_display_filtered_components()
-
-    def admin_display_filtered_components(self):
-        """Отображает отфильтрованные компоненты"""
+        """Применяет фильтры к списку компонентов: отбор и сортировка выполняются сервером, показывается первая страница"""
+        self.admin_catalog_params = build_component_search_params(
+            self.admin_type_filter.get(),
+            self.admin_min_price_filter.get(),
+            self.admin_max_price_filter.get(),
+            self.admin_search_var.get().strip(),
+            self.admin_sort_filter.get()
+        )
+        self.admin_next_cursor = None
         for item in self.components_tree.get_children():
             self.components_tree.delete(item)
+        self.admin_load_components_page()
+
+    def admin_load_components_page(self):
+        """Загружает следующую страницу компонентов с сервера и добавляет ее в таблицу"""
+        params = {**self.admin_catalog_params, 'limit': CATALOG_PAGE_SIZE}
+        if self.admin_next_cursor is not None:
+            params['after'] = self.admin_next_cursor
+        page = self.make_api_request('/components/search/', params=params)
+        if page is None:
+            return
         
-        for component in self.admin_filtered_components:
+        self.admin_next_cursor = page['next_cursor']
+        self.admin_load_more_button.config(state='normal' if self.admin_next_cursor is not None else 'disabled')
+        for component in page['items']:
             self.components_tree.insert('', 'end', values=(
                 component['id'],
                 component['name'],
@@ -3433,12 +3518,22 @@ class AdminApp:
                 component['stock_quantity']
             ))
 
+    def admin_reset_filters(self):
+        """Сбрасывает фильтры компонентов"""
+        self.admin_type_filter.set('Все типы')
+        self.admin_min_price_filter.set('')
+        self.admin_max_price_filter.set('')
+        self.admin_search_var.set('')
+        self.admin_apply_filters()
+
     def admin_search_components(self):
         """Выполняет поиск компонентов"""
         self.admin_apply_filters()
         
         if self.admin_search_var.get().strip():
-            messagebox.showinfo('Поиск', f'Найдено компонентов: {len(self.admin_filtered_components)}')
+            facets = self.make_api_request('/components/facets/', params=facets_params(self.admin_catalog_params))
+            if facets is not None:
+                messagebox.showinfo('Поиск', f'Найдено компонентов: {count_found_components(facets)}')
 
     def admin_clear_search(self):
         """Очищает поисковый запрос"""
@@ -3581,7 +3676,7 @@ class AdminApp:
             """Загрузка данных о компоненте"""
             try:
                 headers = {'token': self.token}
-                response = requests.get(
+                response = http_session.get(
                     f'{self.base_url}/components/get_by_id/',
                     headers=headers,
                     params={'component_id': component_id}
@@ -3765,7 +3860,7 @@ class AdminApp:
 
     def load_configurations(self):
         """Загружает список конфигураций"""
-        data = self.make_api_request('/configurations/admin/get_all/')
+        data = self.make_paged_api_request('/configurations/admin/get_all/')
         if data:
             self.all_configurations = data
             self.display_configurations(data)
@@ -3981,7 +4076,7 @@ class AdminApp:
     
     def load_orders(self):
         """Загружает список заказов"""
-        data = self.make_api_request('/orders/admin/get_all')
+        data = self.make_paged_api_request('/orders/admin/get_all')
         if data:
             self.all_orders = data
             self.apply_admin_orders_sort()
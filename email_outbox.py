@@ -0,0 +1,118 @@
+import os
+import datetime
+from models import EmailOutbox
+from queue_worker import QueueWorker
+from email_utils import SMTP_FROM, open_smtp_connection, build_message
+
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50))
+EMAIL_POLL_INTERVAL = int(os.getenv("EMAIL_POLL_INTERVAL", 5))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+EMAIL_RETRY_DELAY = int(os.getenv("EMAIL_RETRY_DELAY", 30))
+# Письмо, которое обработчик забрал, но не отметил отправленным или ошибочным за это время
+# (поток или процесс завершился во время отправки), возвращается в очередь как неудачная попытка
+EMAIL_CLAIM_TIMEOUT = int(os.getenv("EMAIL_CLAIM_TIMEOUT", 300))
+
+def enqueue_email(to_email: str, subject: str, body: str) -> EmailOutbox:
+    """Ставит письмо в очередь на отправку и будит фоновый обработчик"""
+    message = EmailOutbox.create(to_email=to_email, subject=subject, body=body)
+    email_worker.notify()
+    return message
+
+def claim_message(message: EmailOutbox) -> bool:
+    """Помечает письмо как отправляемое, если его еще не забрал другой обработчик.
+    
+    Зависшее письмо со статусом 'sending' забирается повторно с учетом потерянной попытки."""
+    now = datetime.datetime.now()
+    if message.status == 'pending':
+        return EmailOutbox.update(status='sending', claimed_at=now).where(
+            (EmailOutbox.id==message.id) &
+            (EmailOutbox.status=='pending')
+        ).execute() == 1
+    
+    attempts = message.attempts + 1
+    if attempts >= EMAIL_MAX_ATTEMPTS:
+        EmailOutbox.update(
+            status='failed',
+            attempts=attempts,
+            last_error='Обработчик не завершил отправку письма.'
+        ).where(
+            (EmailOutbox.id==message.id) &
+            (EmailOutbox.status=='sending') &
+            (EmailOutbox.claimed_at==message.claimed_at)
+        ).execute()
+        return False
+    
+    claimed = EmailOutbox.update(status='sending', claimed_at=now, attempts=attempts).where(
+        (EmailOutbox.id==message.id) &
+        (EmailOutbox.status=='sending') &
+        (EmailOutbox.claimed_at==message.claimed_at)
+    ).execute() == 1
+    if claimed:
+        message.attempts = attempts
+    return claimed
+
+def mark_sent(message: EmailOutbox):
+    """Фиксирует успешную отправку письма"""
+    EmailOutbox.update(
+        status='sent',
+        attempts=EmailOutbox.attempts + 1,
+        sent_at=datetime.datetime.now(),
+        last_error=None
+    ).where(EmailOutbox.id==message.id).execute()
+
+def mark_failed(message: EmailOutbox, error: Exception):
+    """Фиксирует ошибку отправки и назначает повтор с экспоненциальной задержкой"""
+    attempts = message.attempts + 1
+    if attempts >= EMAIL_MAX_ATTEMPTS:
+        status = 'failed'
+        next_attempt_at = message.next_attempt_at
+    else:
+        status = 'pending'
+        next_attempt_at = datetime.datetime.now() + datetime.timedelta(seconds=EMAIL_RETRY_DELAY * 2 ** (attempts - 1))
+
+    EmailOutbox.update(
+        status=status,
+        attempts=attempts,
+        next_attempt_at=next_attempt_at,
+        last_error=str(error)
+    ).where(EmailOutbox.id==message.id).execute()
+
+def deliver_pending_emails(batch_size: int = EMAIL_BATCH_SIZE) -> int:
+    """Отправляет пачку ожидающих и зависших писем через одно SMTP-соединение, возвращает число обработанных"""
+    now = datetime.datetime.now()
+    messages = [message for message in EmailOutbox.select().where(
+        ((EmailOutbox.status=='pending') &
+         (EmailOutbox.next_attempt_at <= now)) |
+        ((EmailOutbox.status=='sending') &
+         (EmailOutbox.claimed_at < now - datetime.timedelta(seconds=EMAIL_CLAIM_TIMEOUT)))
+    ).order_by(EmailOutbox.id).limit(batch_size) if claim_message(message)]
+
+    if not messages:
+        return 0
+
+    try:
+        server = open_smtp_connection()
+    except Exception as e:
+        print(f"Ошибка подключения к SMTP-серверу: {e}")
+        for message in messages:
+            mark_failed(message, e)
+        return len(messages)
+
+    try:
+        for message in messages:
+            try:
+                msg = build_message(message.to_email, message.subject, message.body)
+                server.sendmail(SMTP_FROM, message.to_email, msg.as_string())
+                mark_sent(message)
+            except Exception as e:
+                print(f"Ошибка отправки письма #{message.id}: {e}")
+                mark_failed(message, e)
+    finally:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    return len(messages)
+
+email_worker = QueueWorker(deliver_pending_emails, 'email-outbox', EMAIL_POLL_INTERVAL)
@@ -8,23 +8,42 @@ from dotenv import load_dotenv
 load_dotenv()
 
 SMTP_SERVER = os.getenv("SMTP_SERVER")
-SMTP_PORT = os.getenv("SMTP_PORT")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PASS = os.getenv("SMTP_PASS")
+SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER)
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "1") == "1"
+SMTP_TIMEOUT = int(os.getenv("SMTP_TIMEOUT", 30))
 
-def send_email(to_email: str, subject: str, body: str):
-    """Отправляет email через SMTP"""
+def open_smtp_connection() -> smtplib.SMTP:
+    """Открывает SMTP-соединение с STARTTLS и авторизацией, если они настроены"""
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    try:
+        if SMTP_USE_TLS:
+            server.starttls()
+        if SMTP_USER and SMTP_PASS:
+            server.login(SMTP_USER, SMTP_PASS)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+def build_message(to_email: str, subject: str, body: str) -> MIMEMultipart:
+    """Формирует письмо с текстовым содержимым"""
     msg = MIMEMultipart()
-    msg['From'] = SMTP_USER
+    msg['From'] = SMTP_FROM
     msg['To'] = to_email
     msg['Subject'] = subject
     msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+def send_email(to_email: str, subject: str, body: str):
+    """Отправляет email через SMTP"""
+    msg = build_message(to_email, subject, body)
 
     try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
-        server.sendmail(SMTP_USER, to_email, msg.as_string())
+        server = open_smtp_connection()
+        server.sendmail(SMTP_FROM, to_email, msg.as_string())
         server.quit()
         print("Письмо успешно отправлено.")
     except Exception as e:
@@ -0,0 +1,35 @@
+import datetime
+import json
+from decimal import Decimal
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def default_encoder(value):
+    """Преобразование типов, которые не поддерживаются JSON-кодировщиком напрямую"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f'Объект типа {type(value).__name__} не сериализуется в JSON')
+
+def dumps(content) -> bytes:
+    """Кодирование содержимого в JSON: через orjson, если он установлен, иначе стандартным модулем json"""
+    if orjson is not None:
+        return orjson.dumps(content, default=default_encoder, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=default_encoder,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(',', ':')
+    ).encode('utf-8')
+
+class FastJSONResponse(JSONResponse):
+    """JSON-ответ, который кодирует Decimal и datetime без прохода jsonable_encoder"""
+    def render(self, content) -> bytes:
+        return dumps(content)
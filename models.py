@@ -1,9 +1,13 @@
-from peewee import CharField, IntegerField, AutoField, ForeignKeyField, DateField, DateTimeField, Model, TextField, DecimalField
+from peewee import CharField, IntegerField, AutoField, ForeignKeyField, DateField, DateTimeField, Model, TextField, DecimalField, \
+    FloatField, JOIN, Value, fn
+from playhouse.migrate import SchemaMigrator, migrate
 from database import db_connection
+from typing import List
 from hashing_password import hash_password
 import datetime
 import hashlib
 import json
+import re
 
 
 class JSONField(TextField):
@@ -33,9 +37,9 @@ class Users(BaseModel):
     """Модель таблицы пользователей системы"""
     id = AutoField()
     name = CharField(max_length=255, null=False)
-    email = CharField(max_length=255, null=False)
+    email = CharField(max_length=255, null=False, unique=True)
     password = CharField(max_length=255, null=False)
-    phone = CharField(max_length=20, null=False)
+    phone = CharField(max_length=20, null=False, unique=True)
     role_id = ForeignKeyField(Roles, on_delete='CASCADE', backref='user_role', on_update='CASCADE')
     address = TextField(null=True)
 
@@ -46,14 +50,19 @@ class PasswordChangeRequest(BaseModel):
     code = CharField(max_length=10)
     created_at = DateTimeField(default=datetime.datetime.now())
     expires_at = DateTimeField()
+    
+    class Meta:
+        indexes = (
+            (('user', 'code', 'created_at'), False),
+        )
 
 class UserToken(BaseModel):
     """Модель таблицы токенов пользователей для аутентификации"""
     id = AutoField()
     user_id = ForeignKeyField(Users, on_delete='CASCADE', null=False, backref='us_token', on_update='CASCADE')
-    token = CharField(max_length=255, null=False)
+    token = CharField(max_length=255, null=False, unique=True)
     created_at = DateTimeField(default=datetime.datetime.now(), null=False)
-    expires_at = DateTimeField(null=False)
+    expires_at = DateTimeField(null=False, index=True)
 
 class Manufactures(BaseModel):
     """Модель таблицы производителей компонентов"""
@@ -69,12 +78,18 @@ class ComponentsTypes(BaseModel):
 class Components(BaseModel):
     """Модель таблицы компонентов/запчастей для ПК"""
     id = AutoField()
-    name = CharField(max_length=255, null=False)
+    name = CharField(max_length=255, null=False, unique=True)
     type_id = ForeignKeyField(ComponentsTypes, on_delete='SET NULL', null=True, backref='type_comp', on_update='CASCADE')
     manufactures_id = ForeignKeyField(Manufactures, on_delete='SET NULL', null=True, backref='man_comp', on_update='CASCADE')
-    price = DecimalField(max_digits=15, decimal_places=2, null=False)
+    price = DecimalField(max_digits=15, decimal_places=2, null=False, index=True)
     stock_quantity = IntegerField(null=True, default=0)
     specification = JSONField(null=True)
+    
+    class Meta:
+        indexes = (
+            (('type_id', 'price'), False),
+            (('manufactures_id', 'price'), False),
+        )
 
 class Configurations(BaseModel):
     """Модель таблицы конфигураций ПК, создаваемых пользователями"""
@@ -83,6 +98,8 @@ class Configurations(BaseModel):
     name_config = CharField(max_length=255, null=True)
     description = TextField(null=True)
     created_at = DateField(default=datetime.datetime.now())
+    total_price = DecimalField(max_digits=15, decimal_places=2, null=False, default=0)
+    items_count = IntegerField(null=False, default=0)
 
 class ConfigurationsComponents(BaseModel):
     """Модель таблицы связи конфигураций и компонентов (многие-ко-многим)"""
@@ -103,6 +120,11 @@ class Orders(BaseModel):
     order_date = DateTimeField(null=False, default=datetime.datetime.now())
     total_amout = DecimalField(max_digits=15, decimal_places=2, null=False)
     status_id = ForeignKeyField(OrdersStatus, on_delete='CASCADE', backref='order_status', on_update='CASCADE')
+    
+    class Meta:
+        indexes = (
+            (('user_id', 'order_date'), False),
+        )
 
 class OrderConfigurations(BaseModel):
     """Модель таблицы связи заказов и конфигураций (многие-ко-многим)"""
@@ -112,6 +134,81 @@ class OrderConfigurations(BaseModel):
     quantity = IntegerField(null=False, default=1)
     price_at_time = DecimalField(max_digits=15, decimal_places=2, null=False)
 
+class ComponentsChangeLog(BaseModel):
+    """Модель журнала изменений компонентов; версия записи служит версией каталога для дельта-синхронизации"""
+    id = AutoField()
+    component_id = IntegerField(null=False, index=True)
+    action = CharField(max_length=10, null=False, default='upsert')
+    changed_at = DateTimeField(null=False, default=datetime.datetime.now)
+    version = IntegerField(null=False, default=0, index=True)
+
+class CatalogVersion(BaseModel):
+    """Модель счетчика версий каталога из одной строки"""
+    id = IntegerField(primary_key=True)
+    value = IntegerField(null=False, default=0)
+
+class ComponentsSearchIndex(BaseModel):
+    """Модель инвертированного индекса полнотекстового поиска по компонентам: слово -> компонент и вес"""
+    id = AutoField()
+    term = CharField(max_length=64, null=False)
+    component_id = IntegerField(null=False, index=True)
+    weight = IntegerField(null=False, default=1)
+    
+    class Meta:
+        indexes = (
+            (('term', 'component_id'), False),
+        )
+
+class ComponentsAttributes(BaseModel):
+    """Модель таблицы характеристик компонентов в виде пар ключ-значение для индексированных фильтров"""
+    id = AutoField()
+    component_id = IntegerField(null=False, index=True)
+    key = CharField(max_length=100, null=False)
+    value = CharField(max_length=255, null=False)
+    value_number = FloatField(null=True)
+    
+    class Meta:
+        indexes = (
+            (('key', 'value', 'component_id'), False),
+            (('key', 'value_number'), False),
+        )
+
+class ComponentsIncompatibility(BaseModel):
+    """Модель индекса несовместимых пар компонентов; каждая пара хранится в обоих направлениях"""
+    id = AutoField()
+    component_id = IntegerField(null=False)
+    other_id = IntegerField(null=False, index=True)
+    
+    class Meta:
+        indexes = (
+            (('component_id', 'other_id'), True),
+        )
+
+class ComponentsIndexQueue(BaseModel):
+    """Модель очереди компонентов, поисковый индекс, характеристики и совместимость которых пересчитывает фоновый обработчик"""
+    id = AutoField()
+    component_id = IntegerField(null=False)
+    queued_at = DateTimeField(null=False, default=datetime.datetime.now)
+
+class EmailOutbox(BaseModel):
+    """Модель таблицы исходящих писем, ожидающих отправки фоновым обработчиком"""
+    id = AutoField()
+    to_email = CharField(max_length=255, null=False)
+    subject = CharField(max_length=255, null=False)
+    body = TextField(null=False)
+    status = CharField(max_length=20, null=False, default='pending')
+    attempts = IntegerField(null=False, default=0)
+    next_attempt_at = DateTimeField(null=False, default=datetime.datetime.now)
+    last_error = TextField(null=True)
+    created_at = DateTimeField(null=False, default=datetime.datetime.now)
+    claimed_at = DateTimeField(null=True)
+    sent_at = DateTimeField(null=True)
+    
+    class Meta:
+        indexes = (
+            (('status', 'next_attempt_at'), False),
+        )
+
 tables = [Roles,
           Users,
           PasswordChangeRequest,
@@ -123,15 +220,322 @@ tables = [Roles,
           ConfigurationsComponents,
           OrdersStatus,
           Orders,
-          OrderConfigurations]
+          OrderConfigurations,
+          ComponentsChangeLog,
+          CatalogVersion,
+          ComponentsSearchIndex,
+          ComponentsAttributes,
+          ComponentsIncompatibility,
+          ComponentsIndexQueue,
+          EmailOutbox]
+
+class SchemaVersion(BaseModel):
+    """Модель таблицы примененных миграций схемы БД"""
+    version = IntegerField(primary_key=True)
+    applied_at = DateTimeField(default=datetime.datetime.now)
+
+LOOKUP_INDEXES = [
+    (Users, ('email',), True),
+    (Users, ('phone',), True),
+    (UserToken, ('token',), True),
+    (UserToken, ('expires_at',), False),
+    (PasswordChangeRequest, ('user', 'code', 'created_at'), False),
+    (Components, ('name',), True),
+    (Orders, ('user_id', 'order_date'), False)
+]
+
+CATALOG_INDEXES = [
+    (Components, ('price',), False),
+    (Components, ('type_id', 'price'), False),
+    (Components, ('manufactures_id', 'price'), False)
+]
 
 def init_tables():
     """Инициализация и создание всех таблиц в базе данных"""
-    try:
-        db_connection.create_tables(tables, safe=True)
-        print(f'Таблицы успешно созданы. Количество: {len(tables)}.')
-    except Exception as e:
-        print(f'Ошибка при создании таблиц: {e}.')
+    db_connection.create_tables(tables, safe=True)
+    print(f'Таблицы успешно созданы. Количество: {len(tables)}.')
+
+def add_index_if_missing(migrator, model, field_names, unique):
+    """Создание индекса по полям модели, если индекса с такими столбцами еще нет"""
+    table = model._meta.table_name
+    columns = [model._meta.fields[name].column_name for name in field_names]
+    existing = [index.columns for index in db_connection.get_indexes(table)]
+    if columns in existing:
+        return
+    migrate(migrator.add_index(table, columns, unique))
+
+def add_column_if_missing(migrator, model, field):
+    """Добавление в таблицу столбца поля модели, если такого столбца еще нет"""
+    table = model._meta.table_name
+    existing = [column.name for column in db_connection.get_columns(table)]
+    if field.column_name in existing:
+        return
+    migrate(migrator.add_column(table, field.column_name, field))
+
+def add_lookup_indexes():
+    """Создание индексов по столбцам, используемым в условиях поиска"""
+    migrator = SchemaMigrator.from_database(db_connection)
+    for model, field_names, unique in LOOKUP_INDEXES:
+        add_index_if_missing(migrator, model, field_names, unique)
+
+def add_catalog_indexes():
+    """Создание индексов для фильтрации и сортировки каталога компонентов"""
+    migrator = SchemaMigrator.from_database(db_connection)
+    for model, field_names, unique in CATALOG_INDEXES:
+        add_index_if_missing(migrator, model, field_names, unique)
+
+def create_email_outbox():
+    """Создание таблицы исходящих писем"""
+    db_connection.create_tables([EmailOutbox], safe=True)
+
+def add_email_outbox_claimed_at():
+    """Добавление времени захвата письма обработчиком для возврата зависших писем в очередь"""
+    migrator = SchemaMigrator.from_database(db_connection)
+    add_column_if_missing(migrator, EmailOutbox, EmailOutbox.claimed_at)
+
+def next_catalog_version() -> int:
+    """Выделение следующей версии каталога; вызывается в транзакции, которая пишет журнал изменений.
+    
+    Строка счетчика остается заблокированной до фиксации транзакции, поэтому версии становятся видны
+    читателям строго по возрастанию (ID автоинкремента выдаются не в порядке фиксации)."""
+    if not CatalogVersion.update(value=CatalogVersion.value + 1).where(CatalogVersion.id==1).execute():
+        start = ComponentsChangeLog.select(fn.MAX(ComponentsChangeLog.version)).scalar() or 0
+        CatalogVersion.create(id=1, value=start + 1)
+    return CatalogVersion.select(CatalogVersion.value).where(CatalogVersion.id==1).scalar()
+
+def backfill_components_change_log():
+    """Запись 'upsert' в журнал изменений для каждого компонента, которого в журнале еще нет"""
+    logged_ids = ComponentsChangeLog.select(ComponentsChangeLog.component_id)
+    if not Components.select().where(Components.id.not_in(logged_ids)).exists():
+        return
+    missing = (Components
+               .select(Components.id, Value('upsert'), Value(datetime.datetime.now()), Value(next_catalog_version()))
+               .where(Components.id.not_in(logged_ids))
+               .order_by(Components.id))
+    ComponentsChangeLog.insert_from(
+        missing,
+        [ComponentsChangeLog.component_id, ComponentsChangeLog.action, ComponentsChangeLog.changed_at,
+         ComponentsChangeLog.version]
+    ).execute()
+
+def create_components_change_log():
+    """Создание журнала изменений компонентов и запись в него уже существующих компонентов"""
+    db_connection.create_tables([ComponentsChangeLog, CatalogVersion], safe=True)
+    backfill_components_change_log()
+
+def add_components_change_log_version():
+    """Версии журнала изменений из счетчика вместо ID записей; существующие записи сохраняют версию, равную ID"""
+    migrator = SchemaMigrator.from_database(db_connection)
+    db_connection.create_tables([CatalogVersion], safe=True)
+    add_column_if_missing(migrator, ComponentsChangeLog, ComponentsChangeLog.version)
+    ComponentsChangeLog.update(version=ComponentsChangeLog.id).where(ComponentsChangeLog.version==0).execute()
+    
+    version = ComponentsChangeLog.select(fn.MAX(ComponentsChangeLog.version)).scalar() or 0
+    current = CatalogVersion.select(CatalogVersion.value).where(CatalogVersion.id==1).scalar()
+    if current is None:
+        CatalogVersion.create(id=1, value=version)
+    elif current < version:
+        CatalogVersion.update(value=version).where(CatalogVersion.id==1).execute()
+
+# Вес слова в ранжировании поиска в зависимости от поля, в котором оно встретилось
+SEARCH_WEIGHTS = {
+    'name': 4,
+    'type_name': 2,
+    'manufacture_name': 2,
+    'specification': 1
+}
+SEARCH_TERM_LENGTH = 64
+
+def tokenize(text) -> List[str]:
+    """Разбиение текста на слова в нижнем регистре для поискового индекса"""
+    if text is None:
+        return []
+    return [term[:SEARCH_TERM_LENGTH] for term in re.findall(r'\w+', str(text).lower().replace('ё', 'е'))]
+
+def flatten_specification(specification) -> List[str]:
+    """Все значения спецификации компонента, включая вложенные, в виде строк"""
+    if specification is None:
+        return []
+    if isinstance(specification, dict):
+        return [value for item in specification.values() for value in flatten_specification(item)]
+    if isinstance(specification, list):
+        return [value for item in specification for value in flatten_specification(item)]
+    return [str(specification)]
+
+def index_components(component_ids: List[int]):
+    """Пересчет записей поискового индекса для указанных компонентов; удаленные компоненты выпадают из индекса"""
+    if not component_ids:
+        return
+    
+    rows = (Components
+            .select(Components.id, Components.name, ComponentsTypes.name, Manufactures.name, Components.specification)
+            .join(ComponentsTypes, JOIN.LEFT_OUTER)
+            .switch(Components)
+            .join(Manufactures, JOIN.LEFT_OUTER)
+            .where(Components.id.in_(component_ids))
+            .tuples())
+    
+    entries = []
+    for component_id, name, type_name, manufacture_name, specification in rows:
+        weights = {}
+        for field, texts in (('name', [name]),
+                             ('type_name', [type_name]),
+                             ('manufacture_name', [manufacture_name]),
+                             ('specification', flatten_specification(specification))):
+            for text in texts:
+                for term in tokenize(text):
+                    weights[term] = max(weights.get(term, 0), SEARCH_WEIGHTS[field])
+        entries.extend({'term': term, 'component_id': component_id, 'weight': weight}
+                       for term, weight in weights.items())
+    
+    ComponentsSearchIndex.delete().where(ComponentsSearchIndex.component_id.in_(component_ids)).execute()
+    for start in range(0, len(entries), 500):
+        ComponentsSearchIndex.insert_many(entries[start:start + 500]).execute()
+
+def rebuild_search_index():
+    """Полное перестроение поискового индекса по всем компонентам"""
+    ComponentsSearchIndex.delete().execute()
+    index_components([component_id for component_id, in Components.select(Components.id).tuples()])
+
+def create_components_search_index():
+    """Создание и заполнение поискового индекса компонентов"""
+    db_connection.create_tables([ComponentsSearchIndex], safe=True)
+    rebuild_search_index()
+
+ATTRIBUTE_KEY_LENGTH = 100
+ATTRIBUTE_VALUE_LENGTH = 255
+
+def normalize_attribute_key(key) -> str:
+    """Ключ характеристики в нижнем регистре без лишних пробелов"""
+    return ' '.join(str(key).lower().split())[:ATTRIBUTE_KEY_LENGTH]
+
+def specification_attributes(specification) -> List[tuple]:
+    """Пары (ключ, значение) спецификации; значения через запятую и списки дают несколько пар с одним ключом"""
+    if isinstance(specification, list):
+        return [pair for item in specification for pair in specification_attributes(item)]
+    if not isinstance(specification, dict):
+        return []
+    
+    pairs = []
+    for key, value in specification.items():
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            if item is None or isinstance(item, dict):
+                continue
+            for part in str(item).split(','):
+                part = part.strip()
+                if part:
+                    pairs.append((normalize_attribute_key(key), part[:ATTRIBUTE_VALUE_LENGTH]))
+    return pairs
+
+def parse_attribute_number(value: str):
+    """Числовая часть значения характеристики ("750 W" -> 750.0) или None"""
+    match = re.match(r'\s*(-?\d+(?:[.,]\d+)?)', value)
+    return float(match.group(1).replace(',', '.')) if match else None
+
+def index_component_attributes(component_ids: List[int]):
+    """Пересчет характеристик указанных компонентов в таблице ключ-значение"""
+    if not component_ids:
+        return
+    
+    entries = []
+    rows = Components.select(Components.id, Components.specification).where(Components.id.in_(component_ids)).tuples()
+    for component_id, specification in rows:
+        for key, value in dict.fromkeys(specification_attributes(specification)):
+            entries.append({
+                'component_id': component_id,
+                'key': key,
+                'value': value,
+                'value_number': parse_attribute_number(value)
+            })
+    
+    ComponentsAttributes.delete().where(ComponentsAttributes.component_id.in_(component_ids)).execute()
+    for start in range(0, len(entries), 500):
+        ComponentsAttributes.insert_many(entries[start:start + 500]).execute()
+
+def rebuild_component_attributes():
+    """Полное перестроение таблицы характеристик по всем компонентам"""
+    ComponentsAttributes.delete().execute()
+    index_component_attributes([component_id for component_id, in Components.select(Components.id).tuples()])
+
+def create_components_attributes():
+    """Создание и заполнение таблицы характеристик компонентов"""
+    db_connection.create_tables([ComponentsAttributes], safe=True)
+    rebuild_component_attributes()
+
+def queue_components_reindex(component_ids: List[int]):
+    """Постановка компонентов в очередь на пересчет поискового индекса, характеристик и совместимости"""
+    for start in range(0, len(component_ids), 500):
+        ComponentsIndexQueue.insert_many(
+            [{'component_id': component_id} for component_id in component_ids[start:start + 500]]
+        ).execute()
+
+def create_components_index_queue():
+    """Создание очереди переиндексации компонентов"""
+    db_connection.create_tables([ComponentsIndexQueue], safe=True)
+
+def create_components_incompatibility():
+    """Создание индекса несовместимых пар компонентов; заполняет его фоновый обработчик очереди переиндексации"""
+    db_connection.create_tables([ComponentsIncompatibility, ComponentsIndexQueue], safe=True)
+    queue_components_reindex([component_id for component_id, in Components.select(Components.id).tuples()])
+
+def update_configuration_totals(config_ids=None):
+    """Пересчет стоимости и числа единиц товара (сумма количеств) конфигураций одним запросом UPDATE; без config_ids - для всех конфигураций"""
+    total_price = (ConfigurationsComponents
+                   .select(fn.COALESCE(fn.SUM(Components.price * ConfigurationsComponents.quantity), 0))
+                   .join(Components)
+                   .where(ConfigurationsComponents.configuration_id==Configurations.id))
+    items_count = (ConfigurationsComponents
+                   .select(fn.COALESCE(fn.SUM(ConfigurationsComponents.quantity), 0))
+                   .join(Components)
+                   .where(ConfigurationsComponents.configuration_id==Configurations.id))
+    query = Configurations.update(total_price=total_price, items_count=items_count)
+    if config_ids is not None:
+        query = query.where(Configurations.id.in_(config_ids))
+    query.execute()
+
+def add_configuration_totals():
+    """Добавление в конфигурации столбцов стоимости и числа единиц товара и их заполнение"""
+    migrator = SchemaMigrator.from_database(db_connection)
+    for field in (Configurations.total_price, Configurations.items_count):
+        add_column_if_missing(migrator, Configurations, field)
+    update_configuration_totals()
+
+MIGRATIONS = [
+    (1, 'создание таблиц', init_tables),
+    (2, 'индексы для поиска', add_lookup_indexes),
+    (3, 'очередь исходящих писем', create_email_outbox),
+    (4, 'журнал изменений компонентов', create_components_change_log),
+    (5, 'индексы каталога компонентов', add_catalog_indexes),
+    (6, 'поисковый индекс компонентов', create_components_search_index),
+    (7, 'характеристики компонентов', create_components_attributes),
+    (8, 'индекс несовместимых компонентов', create_components_incompatibility),
+    (9, 'стоимость и число единиц товара конфигураций', add_configuration_totals),
+    (10, 'время захвата писем из очереди', add_email_outbox_claimed_at),
+    (11, 'очередь переиндексации компонентов', create_components_index_queue),
+    (12, 'версии журнала изменений компонентов', add_components_change_log_version)
+]
+
+def run_migrations():
+    """Применение к БД всех еще не примененных миграций по порядку версий.
+    
+    Ошибка миграции прерывает запуск: приложение не должно работать с частично обновленной схемой.
+    В MySQL DDL-запросы фиксируются неявно, поэтому транзакция не откатывает уже созданные таблицы,
+    столбцы и индексы; миграции проверяют их наличие и могут быть повторены после исправления данных."""
+    db_connection.create_tables([SchemaVersion], safe=True)
+    applied = {row.version for row in SchemaVersion.select()}
+    
+    for version, description, apply in MIGRATIONS:
+        if version in applied:
+            continue
+        try:
+            with db_connection.atomic():
+                apply()
+                SchemaVersion.create(version=version)
+            print(f'Миграция {version} ({description}) успешно применена.')
+        except Exception as e:
+            print(f'Ошибка при применении миграции {version} ({description}): {e}.')
+            raise
         
 def create_roles():
     """Создание тестовых ролей пользователей"""
@@ -708,14 +1112,18 @@ def create_order_configurations():
     except Exception as e:
         print(f"Ошибка при создании связей заказов с конфигурациями: {e}")
         
-init_tables()
-create_roles()
-create_users()
-create_manufactures()
-create_componentstypes()   
-create_components()
-create_configurations()    
-create_configurations_components()
-create_orders_status()
-create_orders()
-create_order_configurations()
\ No newline at end of file
+def seed_test_data():
+    """Заполнение БД тестовыми данными; индексы компонентов пересчитывает очередь переиндексации"""
+    create_roles()
+    create_users()
+    create_manufactures()
+    create_componentstypes()
+    create_components()
+    create_configurations()
+    create_configurations_components()
+    create_orders_status()
+    create_orders()
+    create_order_configurations()
+    backfill_components_change_log()
+    queue_components_reindex([component_id for component_id, in Components.select(Components.id).tuples()])
+    update_configuration_totals()
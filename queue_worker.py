@@ -0,0 +1,45 @@
+import threading
+from database import db_connection
+
+class QueueWorker:
+    """Фоновый поток, обрабатывающий очередь в БД пачками.
+
+    drain обрабатывает одну пачку и возвращает число обработанных записей; поток вызывает его,
+    пока очередь не опустеет, после чего ждет poll_interval секунд или вызова notify()."""
+    def __init__(self, drain, name: str, poll_interval: float):
+        self.drain = drain
+        self.name = name
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Запускает фоновый поток"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Останавливает фоновый поток"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def notify(self):
+        """Будит поток для немедленной обработки очереди"""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            try:
+                with db_connection.connection_context():
+                    while self.drain() and not self._stopped.is_set():
+                        pass
+            except Exception as e:
+                print(f"Ошибка обработки очереди {self.name}: {e}")
+            self._wakeup.wait(self.poll_interval)
@@ -0,0 +1,15 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Модуль хеширования паролей не хранится в репозитории; тестам каталога хеши не нужны,
+# поэтому при его отсутствии подставляется заглушка
+try:
+    import hashing_password
+except ImportError:
+    hashing_password = types.ModuleType('hashing_password')
+    hashing_password.hash_password = lambda password: f'test:{password}'
+    hashing_password.verify_password = lambda password, hashed: hashed == f'test:{password}'
+    sys.modules['hashing_password'] = hashing_password
@@ -0,0 +1,69 @@
+import pytest
+from peewee import SqliteDatabase
+from models import tables, ComponentsTypes, Manufactures, Components
+from api import select_components_catalog, component_row_to_dict
+
+@pytest.fixture
+def test_db():
+    """Пустая БД SQLite в памяти, к которой на время теста привязаны все модели"""
+    db = SqliteDatabase(':memory:')
+    with db.bind_ctx(tables):
+        db.create_tables(tables)
+        yield db
+    db.close()
+
+def create_components(count: int):
+    """Компоненты с типом и производителем, у каждого свои"""
+    for i in range(count):
+        component_type = ComponentsTypes.create(name=f'Тип {i}')
+        manufacture = Manufactures.create(name=f'Производитель {i}')
+        Components.create(
+            name=f'Компонент {i}',
+            type_id=component_type.id,
+            manufactures_id=manufacture.id,
+            price=1000 + i,
+            stock_quantity=i,
+            specification={'номер': i}
+        )
+
+def count_queries(db, func):
+    """Выполняет функцию и возвращает ее результат и число выполненных SQL-запросов"""
+    executed = []
+    execute_sql = db.execute_sql
+    
+    def counting_execute_sql(sql, params=None, *args, **kwargs):
+        executed.append(sql)
+        return execute_sql(sql, params, *args, **kwargs)
+    
+    db.execute_sql = counting_execute_sql
+    try:
+        result = func()
+    finally:
+        db.execute_sql = execute_sql
+    return result, len(executed)
+
+def load_catalog() -> list:
+    return [component_row_to_dict(row) for row in select_components_catalog()]
+
+@pytest.mark.parametrize('count', [1, 50])
+def test_catalog_uses_single_query(test_db, count):
+    create_components(count)
+    
+    catalog, queries = count_queries(test_db, load_catalog)
+    
+    assert queries == 1
+    assert len(catalog) == count
+    assert catalog[-1]['type_name'] == f'Тип {count - 1}'
+    assert catalog[-1]['manufacture_name'] == f'Производитель {count - 1}'
+
+def test_catalog_query_count_does_not_grow(test_db):
+    create_components(1)
+    _, single = count_queries(test_db, load_catalog)
+    
+    for i in range(100):
+        Components.create(name=f'Компонент без типа {i}', price=i)
+    catalog, many = count_queries(test_db, load_catalog)
+    
+    assert single == many
+    assert catalog[-1]['type_name'] is None
+    assert catalog[-1]['manufacture_name'] is None
@@ -0,0 +1,142 @@
+import pytest
+from peewee import SqliteDatabase
+from models import tables, ComponentsTypes, Components, specification_attributes, parse_attribute_number
+from compatibility import ComponentProfile, check_single_parts, check_cpu_socket, check_ram_type, check_cooler, \
+    check_power, check_form_factor, estimate_power_draw, pair_incompatible, check_parts, compatibility_report, \
+    filled_single_part_type_ids
+
+def make_profile(component_id: int, role: str, specification: dict, name: str = None) -> ComponentProfile:
+    """Профиль компонента из спецификации так же, как его собирает load_profiles из таблицы характеристик"""
+    attributes, numbers = {}, {}
+    for key, value in dict.fromkeys(specification_attributes(specification)):
+        attributes.setdefault(key, []).append(value)
+        number = parse_attribute_number(value)
+        if number is not None and key not in numbers:
+            numbers[key] = number
+    return ComponentProfile(component_id, name or f'Компонент {component_id}', role, attributes, numbers)
+
+def parts(*items) -> dict:
+    """Сборка из пар (профиль, количество), сгруппированных по ролям"""
+    grouped = {}
+    for profile, quantity in items:
+        grouped.setdefault(profile.role, []).append((profile, quantity))
+    return grouped
+
+def rules_found(problems) -> list:
+    """Пары (правило, уровень) найденных проблем"""
+    return [(found['rule'], found['level']) for found in problems]
+
+# Компоненты с характеристиками из тестовых данных seed_test_data
+CPU = make_profile(1, 'cpu', {'сокет': 'LGA 1700', 'ядро': 'Alder Lake', 'количество ядер': 12})
+BOARD = make_profile(2, 'motherboard', {'сокет': 'LGA 1700', 'чипсет': 'Intel Z690', 'формат': 'ATX'})
+GPU = make_profile(3, 'gpu', {'чипсет': 'GeForce RTX 4070', 'видеопамять': '12 GB GDDR6X'})
+RAM = make_profile(5, 'ram', {'тип': 'DDR4', 'объем': '32 GB', 'частота': '3200 MHz'})
+COOLER = make_profile(6, 'cooler', {'тип': 'Воздушное', 'рассеиваемая мощность': '250 W',
+                                    'совместимость': 'LGA 1700, AM4'})
+PSU = make_profile(7, 'psu', {'мощность': '750 W', 'сертификат': '80+ Gold'})
+CASE = make_profile(8, 'case', {'формат': 'Mid-Tower', 'материал': 'Сталь, стекло'})
+
+AM5_CPU = make_profile(11, 'cpu', {'сокет': 'AM5', 'TDP': '120 W'})
+AM5_BOARD = make_profile(12, 'motherboard', {'сокет': 'AM5', 'формат': 'ATX', 'тип памяти': 'DDR5'})
+DDR5_RAM = make_profile(13, 'ram', {'тип': 'DDR5', 'объем': '32 GB'})
+
+def test_single_parts_allows_one_of_each():
+    assert check_single_parts(parts((BOARD, 1), (PSU, 1), (CASE, 1), (RAM, 2))) == []
+
+@pytest.mark.parametrize('items', [
+    [(PSU, 1), (make_profile(14, 'psu', {'мощность': '300 W'}), 1)],
+    [(CASE, 2)]
+])
+def test_single_parts_rejects_duplicates(items):
+    assert rules_found(check_single_parts(parts(*items))) == [('single_part', 'error')]
+
+def test_cpu_socket_match_ignores_spaces():
+    board = make_profile(15, 'motherboard', {'сокет': 'LGA1700'})
+    assert check_cpu_socket(parts((CPU, 1), (board, 1))) == []
+
+def test_cpu_socket_mismatch():
+    problems = check_cpu_socket(parts((CPU, 1), (AM5_BOARD, 1)))
+    assert rules_found(problems) == [('cpu_socket', 'error')]
+    assert problems[0]['component_ids'] == [CPU.component_id, AM5_BOARD.component_id]
+
+def test_cpu_socket_unknown_is_not_an_error():
+    board = make_profile(16, 'motherboard', {'чипсет': 'B660'})
+    assert check_cpu_socket(parts((CPU, 1), (board, 1))) == []
+
+def test_ram_type_extracted_from_value():
+    board = make_profile(17, 'motherboard', {'тип памяти': 'DDR4-3200, до 128 GB'})
+    assert check_ram_type(parts((RAM, 2), (board, 1))) == []
+
+def test_ram_type_not_supported_by_board():
+    assert rules_found(check_ram_type(parts((RAM, 1), (AM5_BOARD, 1)))) == [('ram_type', 'error')]
+
+def test_ram_type_mixed_modules():
+    assert rules_found(check_ram_type(parts((RAM, 1), (DDR5_RAM, 1)))) == [('ram_type', 'error')]
+
+def test_cooler_fits_socket_from_list():
+    assert check_cooler(parts((COOLER, 1), (CPU, 1))) == []
+
+def test_cooler_socket_mismatch():
+    assert rules_found(check_cooler(parts((COOLER, 1), (AM5_CPU, 1)))) == [('cooler_socket', 'error')]
+
+def test_cooler_power_below_cpu_tdp():
+    hot_cpu = make_profile(18, 'cpu', {'сокет': 'LGA 1700', 'TDP': '253 W'})
+    assert rules_found(check_cooler(parts((COOLER, 1), (hot_cpu, 1)))) == [('cooler_power', 'warning')]
+
+def test_power_draw_uses_tdp_and_defaults():
+    # 120 Вт по TDP процессора + 200 Вт по умолчанию для видеокарты x2 + 50 Вт по умолчанию для платы
+    assert estimate_power_draw(parts((AM5_CPU, 1), (GPU, 2), (AM5_BOARD, 1), (PSU, 1))) == 570
+
+def test_power_enough_with_headroom():
+    assert check_power(parts((CPU, 1), (GPU, 1), (BOARD, 1), (PSU, 1))) == []
+
+def test_power_headroom_warning():
+    # 375 Вт потребления: хватает 400 Вт, но меньше запаса 20% (450 Вт)
+    psu = make_profile(19, 'psu', {'мощность': '400 W'})
+    assert rules_found(check_power(parts((CPU, 1), (GPU, 1), (BOARD, 1), (psu, 1)))) == [('power', 'warning')]
+
+def test_power_not_enough():
+    psu = make_profile(20, 'psu', {'мощность': '300 W'})
+    assert rules_found(check_power(parts((CPU, 1), (GPU, 1), (BOARD, 1), (psu, 1)))) == [('power', 'error')]
+
+def test_form_factor_board_fits_case_format():
+    assert check_form_factor(parts((BOARD, 1), (CASE, 1))) == []
+
+@pytest.mark.parametrize('case_specification', [
+    {'формат': 'Mini-ITX'},
+    {'формат': 'Mid-Tower', 'поддержка плат': 'Micro-ATX, Mini-ITX'}
+])
+def test_form_factor_board_does_not_fit(case_specification):
+    case = make_profile(21, 'case', case_specification)
+    assert rules_found(check_form_factor(parts((BOARD, 1), (case, 1)))) == [('form_factor', 'error')]
+
+def test_pair_incompatible():
+    assert not pair_incompatible(CPU, BOARD)
+    assert pair_incompatible(CPU, AM5_BOARD)
+    assert not pair_incompatible(DDR5_RAM, BOARD)
+    assert pair_incompatible(RAM, AM5_BOARD)
+
+def test_check_parts_seed_configuration_is_compatible():
+    profiles = {profile.component_id: profile for profile in (CPU, BOARD, GPU, RAM, COOLER, PSU, CASE)}
+    items = [(component_id, 1) for component_id in profiles]
+    assert compatibility_report(check_parts(items, profiles))['compatible'] is True
+
+def test_check_parts_reports_part_and_socket_errors():
+    profiles = {profile.component_id: profile for profile in (CPU, AM5_BOARD, COOLER, PSU, CASE)}
+    items = [(CPU.component_id, 1), (AM5_BOARD.component_id, 1), (COOLER.component_id, 1), (PSU.component_id, 2)]
+    report = compatibility_report(check_parts(items, profiles))
+    assert report['compatible'] is False
+    assert {found['rule'] for found in report['problems']} == {'single_part', 'cpu_socket'}
+
+def test_filled_single_part_types_match_single_part_rule():
+    db = SqliteDatabase(':memory:')
+    with db.bind_ctx(tables):
+        db.create_tables(tables)
+        type_ids = {name: ComponentsTypes.create(name=name).id for name in ('Процессор', 'Блок питания', 'Корпус')}
+        cpu = Components.create(name='CPU', type_id=type_ids['Процессор'], price=1, stock_quantity=1, specification={})
+        psu = Components.create(name='PSU 300', type_id=type_ids['Блок питания'], price=1, stock_quantity=1,
+                                specification={'мощность': '300 W'})
+        
+        assert filled_single_part_type_ids([cpu.id]) == []
+        assert filled_single_part_type_ids([cpu.id, psu.id]) == [type_ids['Блок питания']]
+    db.close()